@@ -0,0 +1,91 @@
+# ------------------------------------------------------------------------------
+# Cache HTTP (ETag / If-None-Match) dos endpoints públicos de leitura.
+#
+# As respostas de /api/v1/public/* só dependem da versão dos dados e da URL
+# pedida, então o ETag é derivado dessas duas coisas, sem olhar o corpo. Um
+# cliente que já tem a resposta recebe 304 antes mesmo de o endpoint rodar:
+# nada é consultado nem serializado.
+# ------------------------------------------------------------------------------
+
+import hashlib
+from urllib.parse import urlencode
+
+from fastapi import Request
+from fastapi.responses import Response
+from starlette.datastructures import MutableHeaders
+
+
+CACHEABLE_PREFIX = '/api/v1/public/'
+# Refletem o estado do servidor, e não só os dados: nunca entram no cache
+UNCACHEABLE_PATHS = {'/api/v1/public/health'}
+
+
+def is_cacheable(request: Request):
+    path = request.url.path
+    return request.method in ('GET', 'HEAD') and path.startswith(CACHEABLE_PREFIX) and path not in UNCACHEABLE_PATHS
+
+
+def etag_for(version, request: Request):
+    """ETag forte da resposta de 'request' para a versão 'version' dos dados."""
+    # Reescapada: '?category=x%26title%3Dabc' e '?category=x&title=abc' não podem ter o mesmo ETag
+    query = urlencode(sorted(request.query_params.multi_items()))
+    digest = hashlib.sha256(f'{version}\n{request.url.path}\n{query}'.encode('utf-8')).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match, etag):
+    """Compara o header If-None-Match com o ETag (comparação fraca, como pede o HTTP para GET)."""
+    if if_none_match is None:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or any(tag.removeprefix('W/') == etag for tag in tags)
+
+
+class ConditionalGet:
+    """
+    Middleware ASGI que responde 304 quando o cliente já tem a versão atual da
+    resposta e acrescenta ETag e Cache-Control às respostas 200. Como o
+    RequestMetrics (ver api/metrics.py), não usa app.middleware("http"): o 304
+    é o caminho mais frequente de clientes que consultam a API periodicamente e
+    não deve pagar a task e a fila por requisição daquele wrapper.
+
+    Uso: app.add_middleware(ConditionalGet, current_version=..., max_age=...)
+
+    Args:
+        current_version: Função que retorna a versão atual dos dados (ou None se não carregados).
+        max_age (int): Validade, em segundos, das respostas em caches de clientes e CDNs.
+    """
+
+    def __init__(self, app, current_version, max_age):
+        self.app = app
+        self.current_version = current_version
+        self.cache_control = f'public, max-age={max_age}'
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        request = Request(scope)
+        if not is_cacheable(request):
+            return await self.app(scope, receive, send)
+
+        version = self.current_version()
+        if version is not None:
+            etag = etag_for(version, request)
+            if etag_matches(request.headers.get('if-none-match'), etag):
+                response = Response(status_code=304, headers={'ETag': etag, 'Cache-Control': self.cache_control})
+                return await response(scope, receive, send)
+
+        # Criado antes de chamar o app, para que o endpoint grave no mesmo dicionário
+        state = request.state
+
+        async def send_with_etag(message):
+            if message['type'] == 'http.response.start' and message['status'] == 200:
+                # A versão usada pelo endpoint (ver get_dataset), que pode ser mais nova que a consultada acima
+                version = getattr(state, 'data_version', None)
+                if version is not None:
+                    headers = MutableHeaders(scope=message)
+                    headers['ETag'] = etag_for(version, request)
+                    headers['Cache-Control'] = self.cache_control
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
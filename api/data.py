@@ -0,0 +1,271 @@
+# ------------------------------------------------------------------------------
+# Camada de dados da API com carregamento preguiçoso e recarga atômica.
+#
+# Importar a API não lê nenhum arquivo nem importa pandas: o catálogo é
+# carregado no primeiro uso, ou antes, por um aquecimento em background
+# disparado na inicialização. Endpoints que não usam os dados (página
+# inicial, autenticação, health) respondem imediatamente.
+#
+# Os dados ficam em um snapshot imutável e versionado (Dataset). Uma recarga
+# monta o snapshot novo, com todas as estruturas derivadas, fora do caminho
+# das requisições e só então o publica com uma única atribuição. Requisições
+# em andamento terminam com o snapshot que receberam no início.
+#
+# Com vários workers, o snapshot pode ser montado por um único processo e
+# compartilhado pelos demais em arquivos mapeados em memória (ver api/shared.py).
+# ------------------------------------------------------------------------------
+
+import threading
+import time
+
+from .metrics import Gauge, Histogram
+from .pagination import RowSelection
+
+
+# --- Métricas (ver api/metrics.py) ---
+LOAD_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+LOAD_SECONDS = Histogram('dataset_load_seconds', "Tempo de leitura dos arquivos do catálogo.", buckets=LOAD_BUCKETS)
+BUILD_SECONDS = Histogram('dataset_build_seconds', "Tempo de construção de cada estrutura derivada de um snapshot.",
+                          ('structure',), buckets=LOAD_BUCKETS)
+DATASET_ROWS = Gauge('dataset_rows', "Livros no snapshot atual.")
+DATASET_LOADED_AT = Gauge('dataset_loaded_timestamp_seconds', "Horário (Unix) da publicação do snapshot atual.")
+
+
+class Dataset:
+    """
+    Snapshot imutável dos dados do catálogo.
+
+    Args:
+        df_books: Os livros, um por linha.
+        df_ml: As features de ML (id, preço numérico, rating e One-Hot das categorias).
+        version (str): Identifica o conteúdo do snapshot.
+    """
+
+    def __init__(self, df_books, df_ml, version):
+        self.df_books = df_books
+        self.df_ml = df_ml  # DataFrame específico para dados de ML
+        self.version = version
+        self.generation = None  # Geração no diretório compartilhado, se houver (ver api/shared.py)
+        self.loaded_at = time.time()
+        self.aggregates = {}  # Estatísticas já serializadas em JSON (ver api/stats.py)
+        self.search_index = None  # Índice de busca por título e categoria (ver api/search.py)
+        self.price_index = None  # Índice ordenado por preço (ver api/price_index.py)
+        self.rating_index = None  # Ranking por rating, preço e ID (ver api/rankings.py)
+        self.book_json = None  # Os livros já serializados em JSON (ver api/encoding.py)
+        self.features = None  # Features de ML em formato esparso (ver api/features.py)
+
+    @property
+    def empty(self):
+        return self.df_books.empty
+
+    def prepare(self):
+        """
+        Calcula as estruturas derivadas do snapshot (índices e caches). Chamado
+        uma única vez, antes de o snapshot ser publicado.
+        """
+        from .encoding import EncodedRows
+        from .features import FeatureMatrix
+        from .models import Book
+        from .price_index import PriceIndex
+        from .rankings import RatingIndex
+        from .search import SearchIndex
+        from .stats import build_aggregates
+
+        # Sem livros, os endpoints de dados respondem 503 antes de usar qualquer estrutura
+        if self.empty:
+            return self
+        with BUILD_SECONDS.time(structure='aggregates'):
+            self.aggregates = build_aggregates(self.df_books)
+        with BUILD_SECONDS.time(structure='search_index'):
+            self.search_index = SearchIndex(self.df_books)
+        with BUILD_SECONDS.time(structure='price_index'):
+            self.price_index = PriceIndex(self.df_books)
+        with BUILD_SECONDS.time(structure='rating_index'):
+            self.rating_index = RatingIndex(self.df_books)
+        with BUILD_SECONDS.time(structure='book_json'):
+            self.book_json = EncodedRows(self.df_books, Book)
+        with BUILD_SECONDS.time(structure='features'):
+            self.features = FeatureMatrix(self.df_books, self.df_ml)
+        return self
+
+    # --- Consultas dos endpoints de livros (a mesma interface de BookDatabase, em api/storage.py) ---
+    def all_books(self):
+        return RowSelection(range(len(self.df_books)), self.book_json)
+
+    def book(self, book_id):
+        """O JSON de um livro, ou None se ele não existir."""
+        if book_id < 0 or book_id >= len(self.book_json):
+            return None
+        return self.book_json.fragment(book_id)
+
+    def categories(self):
+        return self.df_books['category'].unique().tolist()
+
+    def search(self, title=None, category=None, match='contains', rank=False):
+        return RowSelection(self.search_index.search(title=title, category=category, match=match, rank=rank), self.book_json)
+
+    def price_range(self, min_price, max_price, category=None, min_rating=None, order='id'):
+        rows = self.price_index.query(min_price, max_price, category=category, min_rating=min_rating, order=order)
+        return RowSelection(rows, self.book_json)
+
+    def top_rated(self, limit, min_rating=None, category=None):
+        return RowSelection(self.rating_index.top(limit, min_rating=min_rating, category=category), self.book_json)
+
+    def stats(self, name):
+        return self.aggregates[name]
+
+
+class DataLayer:
+    """
+    Mantém o snapshot atual do catálogo: carrega no primeiro acesso, de forma
+    thread-safe, e troca de snapshot atomicamente quando os dados mudam.
+
+    Args:
+        csv_path (str, opcional): O CSV do scraper.
+        columnar_dir (str, opcional): O diretório do formato colunar.
+        database (str, opcional): O banco SQLite do scraper, lido no lugar do
+            CSV e do formato colunar (ver api/storage.py).
+        shared_dir (str, opcional): Diretório onde o snapshot é publicado para
+            os outros workers, em vez de cada processo montar o seu.
+    """
+
+    def __init__(self, csv_path=None, columnar_dir=None, database=None, shared_dir=None):
+        self.csv_path = csv_path
+        self.columnar_dir = columnar_dir
+        self.database = database
+        self.shared = None
+        if shared_dir:
+            from .shared import SharedSnapshots
+            self.shared = SharedSnapshots(shared_dir)
+        self.dataset = None
+        self.error = None
+        self._lock = threading.Lock()
+        self._warm_up_thread = None
+        self._watch_thread = None
+        self._stop_watch = threading.Event()
+
+    @property
+    def loaded(self):
+        return self.dataset is not None
+
+    @property
+    def loading(self):
+        return self._warm_up_thread is not None and self._warm_up_thread.is_alive()
+
+    @property
+    def stale(self):
+        """Indica que outro worker publicou uma geração mais nova que a deste processo."""
+        return self.shared is not None and self.dataset is not None and self.shared.generation != self.dataset.generation
+
+    def get(self):
+        """
+        Retorna o snapshot atual, carregando-o se necessário.
+
+        Returns:
+            Dataset: Os dados, ou None se os arquivos do catálogo não existirem.
+        """
+        if self.stale:
+            with self._lock:
+                if self.stale:
+                    self._publish(self.shared.latest(self.dataset))
+        if self.dataset is None and self.error is None:
+            with self._lock:
+                if self.dataset is None and self.error is None:
+                    try:
+                        self._publish(self._read())
+                    except FileNotFoundError as e:
+                        self.error = e
+                        print("AVISO: Arquivo 'data/books.csv' não encontrado. Endpoints de dados e ML não funcionarão.")
+        return self.dataset
+
+    def reload(self):
+        """
+        Relê os arquivos do catálogo e publica um novo snapshot se o conteúdo mudou.
+
+        Returns:
+            tuple: (snapshot atual, True se houve troca de snapshot).
+
+        Raises:
+            FileNotFoundError: Se os arquivos do catálogo não existirem; o snapshot atual é mantido.
+        """
+        with self._lock:
+            dataset = self._read()
+            if self.dataset is not None and self.dataset.version == dataset.version:
+                if dataset is not self.dataset:
+                    self._publish(dataset)  # Mesmo conteúdo, outra geração compartilhada
+                return self.dataset, False
+            self._publish(dataset)
+            self.error = None
+            print(f"Dados recarregados: versão {dataset.version} com {len(dataset.df_books)} livros.")
+            return dataset, True
+
+    def warm_up(self):
+        """Inicia o carregamento em uma thread de background, sem bloquear quem chamou."""
+        if self.loaded or self.loading:
+            return
+        self._warm_up_thread = threading.Thread(target=self.get, name="data-warm-up", daemon=True)
+        self._warm_up_thread.start()
+
+    def watch(self, interval):
+        """
+        Inicia uma thread que verifica os arquivos do catálogo a cada 'interval'
+        segundos e recarrega os dados quando eles mudam.
+        """
+        if self._watch_thread is not None:
+            return
+        self._stop_watch.clear()
+        self._watch_thread = threading.Thread(target=self._watch, args=(interval,), name="data-watch", daemon=True)
+        self._watch_thread.start()
+
+    def stop_watch(self):
+        self._stop_watch.set()
+        if self._watch_thread is not None:
+            self._watch_thread.join()
+            self._watch_thread = None
+
+    def _watch(self, interval):
+        from . import dataset as dataset_format
+
+        loaded_signature = seen_signature = dataset_format.source_signature(**self._paths())
+        while not self._stop_watch.wait(interval):
+            signature = dataset_format.source_signature(**self._paths())
+            if signature != seen_signature:
+                # Espera os arquivos pararem de mudar antes de recarregar (o scraper grava mais de um)
+                seen_signature = signature
+                continue
+            if signature != loaded_signature:
+                loaded_signature = signature
+                try:
+                    self.reload()
+                except Exception as e:
+                    print(f"Erro ao recarregar os dados: {e}")
+
+    def _paths(self):
+        paths = {}
+        if self.csv_path:
+            paths['csv_path'] = self.csv_path
+        if self.columnar_dir:
+            paths['directory'] = self.columnar_dir
+        if self.database:
+            paths['database'] = self.database
+        return paths
+
+    def _read(self):
+        if self.shared is None:
+            return self._build()
+        from . import dataset as dataset_format
+
+        return self.shared.load(self._build, dataset_format.source_signature(**self._paths()), attached=self.dataset)
+
+    def _build(self):
+        # Importado aqui para que pandas/numpy só sejam carregados quando os dados forem usados
+        from . import dataset as dataset_format
+
+        with LOAD_SECONDS.time():
+            books = dataset_format.load_books(**self._paths())
+        return Dataset(*books).prepare()
+
+    def _publish(self, dataset):
+        self.dataset = dataset
+        DATASET_ROWS.set(len(dataset.df_books))
+        DATASET_LOADED_AT.set(dataset.loaded_at)
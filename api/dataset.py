@@ -0,0 +1,249 @@
+# ------------------------------------------------------------------------------
+# Formato colunar binário do catálogo de livros.
+#
+# O scraper grava, além do CSV, um diretório com um arquivo .npy por coluna e um
+# manifest.json. As colunas derivadas (preço numérico, códigos de categoria e a
+# matriz One-Hot usada pelos endpoints de ML) já vêm calculadas, e a API carrega
+# os arrays com memory-map em vez de parsear o CSV a cada cold start.
+# ------------------------------------------------------------------------------
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data'))
+CSV_PATH = os.path.join(DATA_DIR, 'books.csv')
+COLUMNAR_DIR = os.path.join(DATA_DIR, 'books_columnar')
+
+MANIFEST = 'manifest.json'
+FORMAT_VERSION = 1
+
+# Colunas de texto, gravadas como um único buffer UTF-8 separado por NUL
+STRING_COLUMNS = ['title', 'price', 'category', 'image_url']
+SEPARATOR = '\0'
+
+
+def parse_price(prices):
+    """Converte a coluna de preço ('£51.77') para float."""
+    return prices.str.replace(r'[^\d.]', '', regex=True).astype(float)
+
+
+def build_ml_frame(df_books, categories=None, onehot=None):
+    """
+    Monta o DataFrame de ML: id, preço numérico, rating e as colunas One-Hot das categorias.
+    """
+    if onehot is None:
+        category_dummies = pd.get_dummies(df_books['category'], prefix='category', dtype=int)
+    else:
+        category_dummies = pd.DataFrame(onehot, columns=[f'category_{c}' for c in categories])
+    return pd.concat([df_books[['id', 'price_numeric', 'rating']], category_dummies], axis=1)
+
+
+def load_csv(path=CSV_PATH):
+    """Lê o CSV do scraper e calcula as colunas derivadas. Retorna (df_books, df_ml)."""
+    df_books = pd.read_csv(path)
+    df_books.reset_index(inplace=True)
+    df_books.rename(columns={'index': 'id'}, inplace=True)
+    df_books['price_numeric'] = parse_price(df_books['price'])
+    return df_books, build_ml_frame(df_books)
+
+
+def file_hash(path):
+    """Calcula o hash do conteúdo de um arquivo."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_columnar(df, directory=COLUMNAR_DIR, source_path=None):
+    """
+    Grava o catálogo (DataFrame com as colunas do CSV do scraper) no formato colunar.
+
+    O diretório é montado ao lado do destino e só então colocado no lugar do
+    anterior, de modo que leitores nunca vejam um conjunto de arquivos pela metade.
+
+    Args:
+        df (pd.DataFrame): Os livros extraídos pelo scraper.
+        directory (str): O diretório de destino.
+        source_path (str, opcional): O CSV de origem; o seu hash, tamanho e data
+            de modificação ficam no manifest para que a API saiba se o formato
+            colunar está atualizado.
+
+    Returns:
+        str: A versão do dataset (hash do conteúdo).
+    """
+    df = df.reset_index(drop=True)
+    categories = sorted(df['category'].unique().tolist())
+    codes = pd.Categorical(df['category'], categories=categories).codes.astype(np.int16)
+
+    arrays = {
+        'price_numeric': parse_price(df['price'].astype(str)).to_numpy(np.float64),
+        'rating': pd.to_numeric(df['rating']).to_numpy(np.int64),
+        'availability': pd.to_numeric(df['availability']).to_numpy(np.int64),
+        'category_codes': codes,
+        'category_onehot': np.eye(len(categories), dtype=np.uint8)[codes],
+    }
+    for column in STRING_COLUMNS:
+        text = SEPARATOR.join(df[column].astype(str).tolist())
+        arrays[column] = np.frombuffer(text.encode('utf-8'), dtype=np.uint8)
+
+    digest = hashlib.sha256()
+    for name in sorted(arrays):
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+    version = digest.hexdigest()[:16]
+
+    tmp_dir = directory + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_dir, f'{name}.npy'), array)
+    manifest = {
+        'format': FORMAT_VERSION,
+        'version': version,
+        'rows': len(df),
+        'categories': categories,
+        'source_sha256': file_hash(source_path) if source_path else None,
+        'source_stat': source_stat(source_path) if source_path else None,
+    }
+    with open(os.path.join(tmp_dir, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+    old_dir = directory + '.old'
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(directory):
+        os.replace(directory, old_dir)
+    os.replace(tmp_dir, directory)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return version
+
+
+def load_columnar(directory=COLUMNAR_DIR):
+    """
+    Carrega o catálogo do formato colunar, com os arrays numéricos mapeados em
+    memória (somente leitura). Retorna (df_books, df_ml, manifest).
+    """
+    with open(os.path.join(directory, MANIFEST), encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    def array(name):
+        return np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+
+    rows = manifest['rows']
+    columns = {'id': np.arange(rows, dtype=np.int64)}
+    for column in ['title', 'price']:
+        columns[column] = _decode_strings(array(column), rows)
+    columns['rating'] = array('rating')
+    columns['availability'] = array('availability')
+    columns['category'] = _decode_strings(array('category'), rows)
+    columns['image_url'] = _decode_strings(array('image_url'), rows)
+    columns['price_numeric'] = array('price_numeric')
+    df_books = pd.DataFrame(columns)
+
+    df_ml = build_ml_frame(df_books, manifest['categories'], array('category_onehot'))
+    return df_books, df_ml, manifest
+
+
+def _decode_strings(buffer, rows):
+    if rows == 0:
+        return []
+    return bytes(buffer).decode('utf-8').split(SEPARATOR)
+
+
+def source_stat(path):
+    """Tamanho e data de modificação (em ns) de um arquivo."""
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def columnar_is_fresh(directory=COLUMNAR_DIR, csv_path=CSV_PATH):
+    """Indica se o formato colunar existe e foi gerado a partir do CSV atual."""
+    manifest_path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(manifest_path):
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    # O CSV intacto desde a conversão dispensa a leitura dele inteiro; o hash só
+    # é calculado se o arquivo foi tocado (ex.: regravado com o mesmo conteúdo)
+    if manifest.get('source_stat') == source_stat(csv_path):
+        return True
+    return manifest.get('source_sha256') == file_hash(csv_path)
+
+
+def load_books(csv_path=CSV_PATH, directory=COLUMNAR_DIR, database=None):
+    """
+    Carrega o catálogo, preferindo o formato colunar quando ele está atualizado,
+    ou do banco SQLite, se 'database' for indicado.
+
+    Returns:
+        tuple: (df_books, df_ml, versão do dataset). A versão é o hash do
+        conteúdo, de modo que os mesmos dados sempre têm a mesma versão.
+
+    Raises:
+        FileNotFoundError: Se nenhum dos formatos existir.
+    """
+    if database:
+        return load_database(database)
+    if columnar_is_fresh(directory, csv_path):
+        df_books, df_ml, manifest = load_columnar(directory)
+        return df_books, df_ml, manifest['version']
+    df_books, df_ml = load_csv(csv_path)
+    return df_books, df_ml, 'csv-' + file_hash(csv_path)[:16]
+
+
+def load_database(path):
+    """
+    Carrega o catálogo do banco SQLite do scraper (ver api/storage.py).
+
+    Returns:
+        tuple: (df_books, df_ml, versão do banco).
+
+    Raises:
+        FileNotFoundError: Se o banco não existir.
+    """
+    from .storage import BookDatabase
+
+    database = BookDatabase(path)
+    if not database.exists:
+        raise FileNotFoundError(path)
+    try:
+        df_books, version = database.read_frame()
+    finally:
+        database.close()
+    df_books['price_numeric'] = parse_price(df_books['price'])
+    return df_books, build_ml_frame(df_books), version
+
+
+def source_signature(csv_path=CSV_PATH, directory=COLUMNAR_DIR, database=None):
+    """
+    Assinatura barata (tamanho e data de modificação) dos arquivos do catálogo,
+    usada para detectar que o scraper publicou dados novos.
+    """
+    signature = []
+    # O banco SQLite em modo WAL só é atualizado no checkpoint; as gravações vão antes para o -wal
+    paths = (database, database + '-wal') if database else (csv_path, os.path.join(directory, MANIFEST))
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_size, stat.st_mtime_ns))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+if __name__ == '__main__':
+    # Converte um CSV existente para o formato colunar: python -m api.dataset [csv] [diretório]
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else CSV_PATH
+    directory = sys.argv[2] if len(sys.argv) > 2 else COLUMNAR_DIR
+    version = write_columnar(pd.read_csv(csv_path), directory, source_path=csv_path)
+    print(f"Formato colunar gravado em {directory} (versão {version}).")
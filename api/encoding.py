@@ -0,0 +1,111 @@
+# ------------------------------------------------------------------------------
+# Serialização rápida das respostas de livros.
+#
+# Os dados de um snapshot são confiáveis: o esquema do DataFrame (colunas,
+# tipos e valores nulos) é validado contra o modelo Pydantic uma única vez, ao
+# carregar os dados. Em seguida, cada linha é serializada em JSON e os trechos
+# ficam guardados em um único buffer. Uma resposta é só a junção dos trechos das
+# linhas pedidas, sem montar dicts nem validar linha a linha a cada requisição.
+# O response_model dos endpoints continua documentando o formato no OpenAPI.
+# ------------------------------------------------------------------------------
+
+import json
+
+import numpy as np
+import pandas as pd
+
+
+class SchemaError(ValueError):
+    """O DataFrame não é compatível com o modelo da resposta."""
+
+
+def _check_column(column, annotation):
+    if column.isna().any():
+        return "contém valores nulos"
+    if annotation is int and not pd.api.types.is_integer_dtype(column):
+        return f"tipo {column.dtype}, esperado inteiro"
+    if annotation is float and not pd.api.types.is_numeric_dtype(column):
+        return f"tipo {column.dtype}, esperado numérico"
+    if annotation is str and pd.api.types.infer_dtype(column, skipna=False) not in ('string', 'empty'):
+        return f"tipo {column.dtype}, esperado texto"
+    return None
+
+
+def validate_schema(df, model):
+    """
+    Confere, coluna a coluna, que o DataFrame pode ser servido como uma lista do
+    modelo, e valida a primeira linha pelo próprio Pydantic.
+
+    Raises:
+        SchemaError: Se faltar uma coluna ou se algum tipo for incompatível.
+    """
+    for name, field in model.model_fields.items():
+        if name not in df.columns:
+            raise SchemaError(f"{model.__name__}: coluna '{name}' ausente nos dados.")
+        problem = _check_column(df[name], field.annotation)
+        if problem:
+            raise SchemaError(f"{model.__name__}: coluna '{name}' {problem}.")
+    if len(df):
+        model.model_validate(df.iloc[0][list(model.model_fields)].to_dict())
+
+
+def encode_record(values, fields):
+    """O JSON compacto (bytes) de um registro, com os campos na ordem dada."""
+    return json.dumps(dict(zip(fields, values)), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class EncodedRows:
+    """
+    As linhas de um DataFrame já serializadas em JSON, no formato de um modelo.
+
+    Todos os trechos ficam em um único buffer, cada um seguido de uma vírgula;
+    'offsets' guarda onde cada linha começa. Uma faixa contígua de linhas já é
+    o conteúdo de um array JSON, sem cópia linha a linha.
+
+    Args:
+        df: O DataFrame, com uma linha por registro (posição = ID).
+        model: O modelo Pydantic da resposta.
+    """
+
+    def __init__(self, df, model):
+        validate_schema(df, model)
+        fields = list(model.model_fields)
+        columns = [df[name].tolist() for name in fields]
+        fragments = [encode_record(values, fields) + b',' for values in zip(*columns)]
+        self.buffer = b''.join(fragments)
+        self.offsets = np.zeros(len(fragments) + 1, dtype=np.int64)
+        np.cumsum([len(fragment) for fragment in fragments], out=self.offsets[1:])
+        self._view = memoryview(self.buffer)
+
+    def __getstate__(self):
+        # O buffer vai como array, que pode ser mapeado em memória (ver api/shared.py)
+        return {'buffer': np.frombuffer(self.buffer, dtype=np.uint8), 'offsets': self.offsets}
+
+    def __setstate__(self, state):
+        self.buffer, self.offsets = state['buffer'], state['offsets']
+        self._view = memoryview(self.buffer)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def fragment(self, row):
+        """O JSON de uma linha."""
+        return bytes(self._view[self.offsets[row]:self.offsets[row + 1] - 1])
+
+    def _fragments(self, rows):
+        offsets, view = self.offsets, self._view
+        return [view[offsets[row]:offsets[row + 1] - 1] for row in np.asarray(rows).tolist()]
+
+    def json_array(self, rows):
+        """Um array JSON com as linhas indicadas, na ordem dada."""
+        if len(rows) == 0:
+            return b'[]'
+        if isinstance(rows, range) and rows.step == 1:
+            return b'[' + self._view[self.offsets[rows.start]:self.offsets[rows.stop] - 1] + b']'
+        return b'[' + b','.join(self._fragments(rows)) + b']'
+
+    def ndjson(self, rows):
+        """As linhas indicadas em NDJSON (um JSON por linha)."""
+        if len(rows) == 0:
+            return b''
+        return b'\n'.join(self._fragments(rows)) + b'\n'
@@ -0,0 +1,216 @@
+# ------------------------------------------------------------------------------
+# Exportação binária do dataset de treinamento (features + rating alvo).
+#
+# Em vez de JSON, a matriz de features é enviada em um formato que os jobs de
+# treinamento carregam direto como arrays: NPZ (sempre disponível), Arrow IPC
+# ou Parquet (ambos requerem o pacote opcional pyarrow). A saída é gerada em
+# lotes a partir dos arrays do snapshot (ver api/features.py), sem converter
+# linha a linha e sem montar o arquivo inteiro em memória.
+#
+# Uso local, sem a API: python -m api.export --format npz --output books_ml.npz
+# ------------------------------------------------------------------------------
+
+import argparse
+import zipfile
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Arrow e Parquet são opcionais
+    pa = pq = None
+
+
+BATCH_SIZE = 65536
+
+# Colunas exportáveis; 'category_onehot' é a matriz One-Hot (uma coluna por
+# categoria do vocabulário) e 'category_index', a mesma informação em um código
+COLUMNS = ['id', 'price_numeric', 'category_index', 'category_onehot', 'rating']
+DEFAULT_COLUMNS = ['id', 'price_numeric', 'category_onehot', 'rating']
+
+FORMATS = {
+    'npz': ('application/x-npz', 'npz'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+
+class ExportError(ValueError):
+    """Pedido de exportação inválido (formato indisponível ou coluna desconhecida)."""
+
+
+def available_formats():
+    return [name for name in FORMATS if name == 'npz' or pa is not None]
+
+
+def negotiate_format(accept):
+    """Escolhe o formato pelo header Accept; NPZ quando nenhum formato conhecido é pedido."""
+    for media_range in (accept or '').split(','):
+        media_type = media_range.split(';')[0].strip()
+        for name, (format_media_type, _) in FORMATS.items():
+            if media_type == format_media_type and name in available_formats():
+                return name
+    return 'npz'
+
+
+def parse_columns(columns):
+    """Valida a seleção de colunas ('id,rating'); None seleciona as colunas padrão."""
+    if not columns:
+        return list(DEFAULT_COLUMNS)
+    selected = list(dict.fromkeys(column.strip() for column in columns.split(',') if column.strip()))
+    unknown = [column for column in selected if column not in COLUMNS]
+    if unknown or not selected:
+        raise ExportError(f"Colunas desconhecidas: {', '.join(unknown)}. Disponíveis: {', '.join(COLUMNS)}.")
+    return selected
+
+
+class _ChunkSink:
+    """Arquivo somente-escrita que acumula o que foi escrito até ser esvaziado."""
+
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+
+    def write(self, data):
+        chunk = bytes(data)
+        self.chunks.append(chunk)
+        return len(chunk)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        chunks, self.chunks = self.chunks, []
+        return chunks
+
+
+class TrainingExport:
+    """
+    Gera a exportação de um snapshot em lotes de bytes.
+
+    Args:
+        features (FeatureMatrix): As features do snapshot.
+        columns (list): As colunas exportadas, na ordem desejada.
+        batch_size (int): Linhas por lote.
+    """
+
+    def __init__(self, features, columns=None, batch_size=BATCH_SIZE):
+        self.features = features
+        self.columns = list(columns or DEFAULT_COLUMNS)
+        self.batch_size = batch_size
+        self._identity = np.eye(len(features.vocabulary), dtype=np.uint8)
+
+    def _column(self, name, start, stop):
+        features = self.features
+        if name == 'id':
+            return features.ids[start:stop]
+        if name == 'price_numeric':
+            return features.prices[start:stop]
+        if name == 'rating':
+            return features.ratings[start:stop]
+        if name == 'category_index':
+            return features.codes[start:stop]
+        # One-Hot montado só para o lote, a partir dos códigos
+        codes = features.codes[start:stop]
+        onehot = self._identity[np.maximum(codes, 0)]
+        onehot[codes < 0] = 0
+        return onehot
+
+    def _batches(self):
+        for start in range(0, len(self.features), self.batch_size):
+            stop = min(start + self.batch_size, len(self.features))
+            yield start, stop
+
+    def iter_bytes(self, format):
+        if format not in available_formats():
+            raise ExportError(f"O formato '{format}' não está disponível (requer o pacote pyarrow).")
+        return getattr(self, f'_iter_{format}')()
+
+    # --- NPZ: um .npy por coluna dentro de um ZIP sem compressão ---
+    def _iter_npz(self):
+        sink = _ChunkSink()
+        rows = len(self.features)
+        with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+            for name in self.columns:
+                sample = self._column(name, 0, 0)
+                header = {'descr': np.lib.format.dtype_to_descr(sample.dtype), 'fortran_order': False,
+                          'shape': (rows,) + sample.shape[1:]}
+                with archive.open(f'{name}.npy', mode='w', force_zip64=True) as member:
+                    np.lib.format.write_array_header_2_0(member, header)
+                    for start, stop in self._batches():
+                        member.write(np.ascontiguousarray(self._column(name, start, stop)).data)
+                        yield from sink.drain()
+            if 'category_onehot' in self.columns or 'category_index' in self.columns:
+                archive.writestr('vocabulary.npy', _npy_bytes(np.array(self.features.vocabulary)))
+        yield from sink.drain()
+
+    # --- Arrow IPC (stream) e Parquet: uma coluna por categoria no lugar da matriz ---
+    def schema(self):
+        fields = []
+        for name in self.columns:
+            if name == 'category_onehot':
+                fields.extend(pa.field(column, pa.uint8()) for column in self.features.vocabulary)
+            else:
+                fields.append(pa.field(name, pa.from_numpy_dtype(self._column(name, 0, 0).dtype)))
+        metadata = {'vocabulary': '\n'.join(self.features.vocabulary)}
+        return pa.schema(fields, metadata=metadata)
+
+    def _record_batch(self, schema, start, stop):
+        arrays = []
+        for name in self.columns:
+            column = self._column(name, start, stop)
+            if name == 'category_onehot':
+                arrays.extend(pa.array(column[:, j]) for j in range(column.shape[1]))
+            else:
+                arrays.append(pa.array(column))
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    def _iter_arrow(self):
+        sink = _ChunkSink()
+        schema = self.schema()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            for start, stop in self._batches():
+                writer.write_batch(self._record_batch(schema, start, stop))
+                yield from sink.drain()
+        yield from sink.drain()
+
+    def _iter_parquet(self):
+        sink = _ChunkSink()
+        schema = self.schema()
+        with pq.ParquetWriter(sink, schema) as writer:
+            for start, stop in self._batches():
+                writer.write_batch(self._record_batch(schema, start, stop))
+                yield from sink.drain()
+        yield from sink.drain()
+
+
+def _npy_bytes(array):
+    sink = _ChunkSink()
+    np.lib.format.write_array(sink, array, allow_pickle=False)
+    return b''.join(sink.drain())
+
+
+if __name__ == '__main__':
+    from .data import DataLayer
+
+    parser = argparse.ArgumentParser(description="Exporta o dataset de treinamento em formato binário.")
+    parser.add_argument('--format', choices=list(FORMATS), default='npz', help="Formato do arquivo.")
+    parser.add_argument('--columns', default=None, help=f"Colunas separadas por vírgula (padrão: {','.join(DEFAULT_COLUMNS)}).")
+    parser.add_argument('--output', default=None, help="Arquivo de saída (padrão: data/books_ml.<extensão>).")
+    parser.add_argument('--csv', default=None, help="O CSV do scraper (padrão: data/books.csv).")
+    parser.add_argument('--columnar-dir', default=None, help="O diretório do formato colunar.")
+    args = parser.parse_args()
+
+    dataset = DataLayer(args.csv, args.columnar_dir).get()
+    if dataset is None:
+        raise SystemExit("Dados não encontrados. Execute o scraper primeiro.")
+    output = args.output or f"data/books_ml.{FORMATS[args.format][1]}"
+    export = TrainingExport(dataset.features, parse_columns(args.columns))
+    with open(output, 'wb') as f:
+        for chunk in export.iter_bytes(args.format):
+            f.write(chunk)
+    print(f"{len(dataset.features)} registros exportados para {output} (versão {dataset.version}).")
@@ -0,0 +1,78 @@
+# ------------------------------------------------------------------------------
+# Matriz de features de ML em formato esparso.
+#
+# Cada livro tem exatamente uma categoria, então a matriz One-Hot (um livro por
+# linha, uma coluna por categoria, quase tudo zero) é guardada só como o código
+# da categoria de cada livro, junto com o vocabulário das colunas (a mesma
+# informação de uma matriz CSR com um único valor por linha). Os registros dos
+# endpoints de ML são montados direto desses arrays, sem percorrer o DataFrame
+# linha a linha, e podem ser enviados no formato compacto (o índice da
+# categoria no vocabulário) em vez de um dict com todas as categorias.
+# ------------------------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+
+
+PREFIX = 'category_'
+
+
+class FeatureMatrix:
+    """
+    Features de ML de um snapshot do catálogo.
+
+    Args:
+        df_books: Os livros, com o ID igual à posição da linha.
+        df_ml: O DataFrame de ML, de onde vem o vocabulário (as colunas One-Hot).
+    """
+
+    def __init__(self, df_books, df_ml):
+        self.vocabulary = [column for column in df_ml.columns if PREFIX in column]
+        self.categories = [column.removeprefix(PREFIX) for column in self.vocabulary]
+        self.ids = df_books['id'].to_numpy(np.int64)
+        self.prices = df_books['price_numeric'].to_numpy(np.float64)
+        self.ratings = df_books['rating'].to_numpy(np.int64)
+        # Índice da categoria de cada livro no vocabulário (-1 se ela não estiver nele)
+        self.codes = pd.Categorical(df_books['category'], categories=self.categories).codes.astype(np.int64)
+        self._zeros = dict.fromkeys(self.vocabulary, 0)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def category_features(self, code):
+        """O dict One-Hot (todas as categorias) de um código de categoria."""
+        features = self._zeros.copy()
+        if code >= 0:
+            features[self.vocabulary[code]] = 1
+        return features
+
+    def features(self, row):
+        return {
+            "id": int(self.ids[row]), "price_numeric": float(self.prices[row]),
+            "category_features": self.category_features(int(self.codes[row])),
+        }
+
+    def compact_features(self, row):
+        return {
+            "id": int(self.ids[row]), "price_numeric": float(self.prices[row]),
+            "category_index": int(self.codes[row]),
+        }
+
+    def training_records(self, rows, compact=False):
+        """
+        Os registros de treinamento (features + rating alvo) das linhas indicadas.
+
+        Args:
+            compact (bool): Usa o índice da categoria no vocabulário em vez do dict One-Hot.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = zip(self.ids[rows].tolist(), self.prices[rows].tolist(), self.codes[rows].tolist(), self.ratings[rows].tolist())
+        if compact:
+            return [
+                {"id": book_id, "price_numeric": price, "category_index": code, "target_rating": rating}
+                for book_id, price, code, rating in columns
+            ]
+        return [
+            {"id": book_id, "price_numeric": price, "category_features": self.category_features(code), "target_rating": rating}
+            for book_id, price, code, rating in columns
+        ]
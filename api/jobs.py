@@ -0,0 +1,205 @@
+# ------------------------------------------------------------------------------
+# Jobs de scraping em background.
+#
+# O endpoint de trigger apenas agenda o job e retorna o seu ID: o crawl roda
+# em uma thread dedicada, sem bloquear as requisições. Só um crawl roda por
+# vez. Ao terminar, o job grava o CSV e o formato colunar (ou, com o SQLite,
+# atualiza o banco) e recarrega os dados da API (ver api/data.py).
+#
+# 'python -m api.jobs' verifica o fluxo completo (agendamento, progresso e
+# recarga dos dados) contra o servidor local de scripts/stub_server.py.
+# ------------------------------------------------------------------------------
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ScrapeJob:
+    """Estado e progresso de uma execução do scraper."""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+    def __init__(self, triggered_by):
+        self.id = uuid.uuid4().hex
+        self.triggered_by = triggered_by
+        self.status = self.QUEUED
+        self.created_at = time.time()
+        self.finished_at = None
+        self.error = None
+        self.data_version = None
+        self.crawler = None
+
+    @property
+    def active(self):
+        return self.status in (self.QUEUED, self.RUNNING)
+
+    def as_dict(self):
+        progress = self.crawler.stats.as_dict() if self.crawler else None
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'triggered_by': self.triggered_by,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'progress': progress,
+            'data_version': self.data_version,
+            'error': self.error,
+        }
+
+
+class ScrapeJobManager:
+    """
+    Agenda e acompanha os jobs de scraping.
+
+    Args:
+        data_layer (DataLayer): Recarregado com os dados novos ao fim de cada job.
+        base_url (str): A URL base do catálogo a ser extraído.
+        concurrency (int): Requisições simultâneas do crawl.
+        history (int): Quantidade de jobs concluídos mantidos para consulta.
+    """
+
+    def __init__(self, data_layer, base_url, concurrency, history=20):
+        self.data_layer = data_layer
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.history = history
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scrape-job")
+
+    def submit(self, triggered_by):
+        """
+        Agenda um novo crawl.
+
+        Returns:
+            tuple: (job, True se ele foi criado agora). Se já houver um crawl em
+            andamento, retorna esse job em vez de iniciar outro.
+        """
+        with self._lock:
+            for job in self.jobs.values():
+                if job.active:
+                    return job, False
+            job = ScrapeJob(triggered_by)
+            self.jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job)
+        return job, True
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def _prune(self):
+        finished = [job for job in self.jobs.values() if not job.active]
+        for job in finished[:max(0, len(finished) - self.history)]:
+            del self.jobs[job.id]
+
+    def _run(self, job):
+        # Importados aqui para que a API só carregue o scraper quando um job rodar
+        from scripts.scraper import AsyncCrawler, save_books
+        from . import dataset as dataset_format
+        from .storage import BookDatabase
+
+        job.status = ScrapeJob.RUNNING
+        print(f"Processo de scraping {job.id} disparado pelo usuário: {job.triggered_by}")
+        try:
+            job.crawler = AsyncCrawler(self.base_url, concurrency=self.concurrency)
+            books_data = asyncio.run(job.crawler.run())
+            if not books_data:
+                raise RuntimeError("Nenhum livro foi extraído.")
+
+            if self.data_layer.database:
+                # Os endpoints de livros leem o banco direto; o snapshot em memória só é relido se já estiver em uso
+                database = BookDatabase(self.data_layer.database)
+                database.upsert_books(books_data)
+                job.data_version = database.state()[0]
+                database.close()
+                if self.data_layer.loaded:
+                    self.data_layer.reload()
+            else:
+                csv_path = self.data_layer.csv_path or dataset_format.CSV_PATH
+                columnar_dir = self.data_layer.columnar_dir or dataset_format.COLUMNAR_DIR
+                df = save_books(books_data, csv_path)
+                dataset_format.write_columnar(df, columnar_dir, source_path=csv_path)
+                dataset, _ = self.data_layer.reload()
+                job.data_version = dataset.version
+            job.status = ScrapeJob.SUCCEEDED
+        except Exception as e:
+            job.error = str(e)
+            job.status = ScrapeJob.FAILED
+            print(f"Erro no processo de scraping {job.id}: {e}")
+        finally:
+            job.finished_at = time.time()
+
+
+def verify_job_flow(storage='memory', timeout=60):
+    """
+    Roda um job de scraping contra o catálogo salvo em scripts/fixtures/site/,
+    servido por scripts/stub_server.py, com os dados em um diretório temporário,
+    e confere o progresso e os dados recarregados com o resultado do scraper
+    síncrono para as mesmas páginas.
+
+    Args:
+        storage (str): 'memory' (CSV + formato colunar) ou 'sqlite'.
+
+    Returns:
+        list: Os problemas encontrados (vazia se o fluxo funcionou).
+    """
+    from scripts.scraper import scrape_all_books
+    from scripts.stub_server import StubServer
+    from .data import DataLayer
+
+    problems = []
+    with StubServer() as server, tempfile.TemporaryDirectory(prefix='scrape_job_') as directory:
+        expected = sorted(book['title'] for book in scrape_all_books(server.base_url))
+        if storage == 'sqlite':
+            data_layer = DataLayer(database=os.path.join(directory, 'books.db'))
+        else:
+            data_layer = DataLayer(os.path.join(directory, 'books.csv'), os.path.join(directory, 'books_columnar'))
+        manager = ScrapeJobManager(data_layer, server.base_url, concurrency=4)
+
+        job, created = manager.submit('verify')
+        if not created or manager.get(job.id) is not job:
+            problems.append("o job não foi agendado")
+        deadline = time.monotonic() + timeout
+        while job.active and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        status = job.as_dict()
+        if status['status'] != ScrapeJob.SUCCEEDED:
+            return problems + [f"o job terminou com status '{status['status']}' (erro: {status['error']})"]
+        if status['progress']['books_parsed'] != len(expected):
+            problems.append(f"progresso com {status['progress']['books_parsed']} livros, esperados {len(expected)}")
+
+        # Com o SQLite, o snapshot em memória só é lido no primeiro uso (ver _run)
+        if storage == 'memory' and not data_layer.loaded:
+            return problems + ["os dados não foram recarregados ao fim do job"]
+        dataset = data_layer.get()
+        if dataset is None:
+            return problems + ["os dados gravados pelo job não puderam ser lidos"]
+        if dataset.version != status['data_version']:
+            problems.append(f"versão dos dados {dataset.version}, o job informou {status['data_version']}")
+        titles = sorted(dataset.df_books['title'])
+        if titles != expected:
+            problems.append(f"livros recarregados {titles}, esperados {expected}")
+    return problems
+
+
+if __name__ == '__main__':
+    failed = False
+    for storage in ('memory', 'sqlite'):
+        problems = verify_job_flow(storage)
+        for problem in problems:
+            print(f"[{storage}] {problem}")
+        failed = failed or bool(problems)
+    if failed:
+        sys.exit(1)
+    print("Jobs de scraping: agendamento, progresso e recarga dos dados funcionam com os backends memory e sqlite.")
@@ -4,128 +4,46 @@
 # de Machine Learning.
 # ------------------------------------------------------------------------------
 
-from fastapi import FastAPI, HTTPException, Query, Depends, APIRouter, status
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi import FastAPI, HTTPException, Query, Depends, APIRouter, Request, status
+from fastapi.responses import JSONResponse, HTMLResponse, Response, StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
-import pandas as pd
-from typing import List, Optional, Dict
-import os
-import random
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import List, Literal, Optional, Dict, Union
+import json
+import threading
 from config import settings
+from .data import DataLayer, Dataset
+from .caching import ConditionalGet
+from .metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE, RequestMetrics, phase
+from .jobs import ScrapeJobManager
+from .pagination import NDJSON_MEDIA_TYPE, Page, json_lines, ndjson_response
 
 # ------------------------------------------------------------------------------
 # --- Importação de Modelos Pydantic ---
 from .models import (
     Book, OverviewStats, CategoryStat,
-    BookFeatures, TrainingDataRecord, PredictionRequest, PredictionResponse
+    BookFeatures, CompactBookFeatures, TrainingDataRecord, CompactTrainingDataRecord,
+    PredictionRequest, PredictionResponse, BatchPredictionRequest, BatchPredictionResponse, ModelInfo
 )
 
 
 # ------------------------------------------------------------------------------
 # --- Seção de segurança ---
-from passlib.context import CryptContext
-from datetime import datetime, timedelta
-import jwt
-from fastapi.security import OAuth2PasswordBearer
-
-# Implementa um fluxo de autenticação padrão OAuth2 com JWT (JSON Web Tokens).
-
-# Instância única para gerenciar a criptografia de senhas.
-# 'argon2' é o esquema padrão por ser mais robusto contra ataques de força bruta
-# em comparação com o 'bcrypt'.
-pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
-
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verifica uma senha em plain-text contra um hash."""
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str) -> str:
-    """Gera o hash de uma senha usando o algoritmo padrão (argon2)."""
-    return pwd_context.hash(password)
-
-def authenticate_user(db: dict, username: str, password: str):
-    """Autentica um usuário. Retorna os dados do usuário se for bem-sucedido, senão None."""
-    if username not in db:
-        return None
-    user = db[username]
-    if not verify_password(password, user["hashed_password"]):
-        return None
-    return user
-
-def create_access_token(data: dict):
-    """
-    Cria um novo token de acesso usando as configurações carregadas.
-    """
-    to_encode = data.copy()
-    # Usa os valores do objeto 'settings' em vez de constantes hardcoded
-    expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    
-    # Usa a chave secreta e o algoritmo do objeto 'settings'
-    encoded_jwt = jwt.encode(
-        to_encode, 
-        settings.SECRET_KEY, 
-        algorithm=settings.ALGORITHM
-    )
-    return encoded_jwt
-
-def create_refresh_token(data: dict):
-    """
-    Cria um novo refresh token.
-    """
-    to_encode = data.copy()
-    # Usa o valor do objeto 'settings'
-    expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire})
-    
-    encoded_jwt = jwt.encode(
-        to_encode, 
-        settings.SECRET_KEY, 
-        algorithm=settings.ALGORITHM
-    )
-    return encoded_jwt
-
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    """
-    Decodifica o token para obter o usuário atual.
-    """
-    try:
-        payload = jwt.decode(
-            token, 
-            settings.SECRET_KEY, 
-            algorithms=[settings.ALGORITHM] 
-        )
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=401, detail="Token inválido")
-        return username
-    except jwt.PyJWTError:
-        raise HTTPException(status_code=401, detail="Token inválido")
-
-
-def get_current_user_from_refresh(token: str = Depends(oauth2_scheme)):
-    """Função similar para o refresh token."""
-    return get_current_user(token)
+# Fluxo OAuth2 com JWT: tokens de acesso e de refresh, verificados com cache (ver api/security.py).
+from .security import (
+    authenticate_user, create_access_token, create_refresh_token, get_users_db,
+    get_current_user, get_current_user_from_refresh
+)
 
 
 # ------------------------------------------------------------------------------
 # Inicializa a instância do FastAPI e executa a lógica de startup, como o
 # carregamento e pré-processamento dos dados.
 
-# --- Simulação de banco de dados de usuários ---
-fake_users_db = {
-    "admin": {
-        "username": "admin",
-        "hashed_password": get_password_hash(settings.DEFAULT_ADMIN_PASSWORD),        
-        "disabled": False,
-    }
-}
-
-
-
-# ------------------------------------------------------------------------------
 # --- Configuração Inicial da Aplicação ---
 description = """
 API para extração de dados de livros do site 'books.toscrape.com'.
@@ -133,7 +51,38 @@ API para extração de dados de livros do site 'books.toscrape.com'.
 Implementa um pipeline de dados completo, desde web scraping até a disponibilização via API RESTful com autenticação JWT e endpoints preparados para Machine Learning.
 """
 
+# --- Carregamento dos dados ---
+# O catálogo é carregado no primeiro uso (ver api/data.py). Na inicialização,
+# um aquecimento em background antecipa esse carregamento sem atrasar o startup.
+# Com SHARED_DATA_DIR, os workers compartilham um único snapshot (ver api/shared.py).
+# Com STORAGE_BACKEND=sqlite, os endpoints de livros consultam o banco do scraper
+# (ver api/storage.py), e o snapshot em memória, lido do mesmo banco, só atende
+# os endpoints de ML.
+book_database = None
+if settings.STORAGE_BACKEND == "sqlite":
+    from .storage import BookDatabase
+    book_database = BookDatabase(settings.DATABASE_PATH, settings.DATABASE_POOL_SIZE)
+data_layer = DataLayer(database=settings.DATABASE_PATH if book_database else None, shared_dir=settings.SHARED_DATA_DIR)
+job_manager = ScrapeJobManager(data_layer, settings.SCRAPER_BASE_URL, settings.SCRAPER_CONCURRENCY)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.PRELOAD_DATA:
+        # Com o SQLite, o snapshot em memória só é carregado se um endpoint de ML for usado
+        if book_database is None:
+            data_layer.warm_up()
+        threading.Thread(target=preload_model, name="model-warm-up", daemon=True).start()
+        # Sem DEFAULT_ADMIN_PASSWORD_HASH, o hash da senha do admin é calculado aqui, antes do primeiro login
+        threading.Thread(target=get_users_db, name="auth-warm-up", daemon=True).start()
+    if settings.DATA_WATCH_INTERVAL > 0:
+        data_layer.watch(settings.DATA_WATCH_INTERVAL)
+    yield
+    data_layer.stop_watch()
+    if book_database is not None:
+        book_database.close()
+
 app = FastAPI(
+    lifespan=lifespan,
     title="API Pública para Consulta de Livros",
     description=description,
     version="1.0.0",
@@ -143,6 +92,28 @@ app = FastAPI(
     },
 )
 
+# ETag e Cache-Control nos endpoints públicos; 304 sem executar o endpoint (ver api/caching.py)
+def current_data_version():
+    """A versão dos dados servidos pelos endpoints de livros (None se não carregados ou desatualizados)."""
+    if book_database is not None:
+        state = book_database.state()
+        return state[0] if state else None
+    # Outro worker publicou uma geração mais nova: sem a pré-checagem, o endpoint
+    # roda, get_dataset passa a usar a nova geração e o ETag antigo não gera 304
+    if data_layer.dataset is None or data_layer.stale:
+        return None
+    return data_layer.dataset.version
+
+app.add_middleware(ConditionalGet, current_version=current_data_version, max_age=settings.HTTP_CACHE_MAX_AGE)
+
+# Perfil de uma requisição com o header 'X-Profile: 1', se habilitado (ver api/profiling.py)
+if settings.PROFILING_ENABLED:
+    from .profiling import ProfileRequest
+    app.middleware("http")(ProfileRequest(settings.PROFILING_INTERVAL))
+
+# Latência por rota e por fase, publicada em /metrics (ver api/metrics.py)
+app.add_middleware(RequestMetrics)
+
 # --- Página inicial ---
 @app.get("/", response_class=HTMLResponse,)
 async def homepage():
@@ -159,28 +130,65 @@ async def homepage():
     </html>
     """
 
-# --- Carregamento e pré-processamento de dados ---
-DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'books.csv')
-df_books = pd.DataFrame()
-df_ml = pd.DataFrame() # DataFrame específico para dados de ML
+#GET /metrics - métricas de desempenho no formato de texto do Prometheus.
+@app.get("/metrics", response_class=Response, tags=["Status"])
+async def metrics():
+    return Response(content=REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
 
-try:
-    df_books = pd.read_csv(DATA_PATH)
-    df_books.reset_index(inplace=True)
-    df_books.rename(columns={'index': 'id'}, inplace=True)
-    df_books['price_numeric'] = df_books['price'].str.replace(r'[^\d.]', '', regex=True).astype(float)
+# --- Dependência de acesso aos dados ---
+async def get_dataset(request: Request) -> Dataset:
+    """
+    Fornece os dados aos endpoints, carregando-os no primeiro uso. O
+    carregamento roda fora do event loop para não travar os demais endpoints.
+    """
+    dataset = data_layer.dataset
+    if dataset is None or data_layer.stale:
+        dataset = await run_in_threadpool(data_layer.get)
+    if dataset is None or dataset.empty:
+        raise HTTPException(status_code=503, detail="Os dados dos livros não estão disponíveis. Execute o scraper primeiro.")
+    request.state.data_version = dataset.version  # Usada no ETag da resposta
+    return dataset
 
 
-    category_dummies = pd.get_dummies(df_books['category'], prefix='category', dtype=int)
-    df_ml = pd.concat([df_books[['id', 'price_numeric', 'rating']], category_dummies], axis=1)
+async def get_books(request: Request):
+    """
+    Fornece aos endpoints de livros o snapshot em memória (Dataset) ou o banco
+    SQLite (BookDatabase), que respondem às mesmas consultas.
+    """
+    if book_database is None:
+        return await get_dataset(request)
+    state = book_database.state()
+    if state is None or state[1] == 0:
+        raise HTTPException(status_code=503, detail="Os dados dos livros não estão disponíveis. Execute o scraper primeiro.")
+    request.state.data_version = state[0]
+    return book_database
 
-except FileNotFoundError:
-    print("AVISO: Arquivo 'data/books.csv' não encontrado. Endpoints de dados e ML não funcionarão.")
 
-# --- Função de Checagem Auxiliar ---
-def check_data_loaded():
-    if df_books.empty:
-        raise HTTPException(status_code=503, detail="Os dados dos livros não estão disponíveis. Execute o scraper primeiro.")
+# --- Listagens paginadas e em streaming (ver api/pagination.py) ---
+ResponseFormat = Query("json", description="'json': uma lista JSON; 'ndjson': um livro por linha, enviado em streaming.")
+
+
+def json_bytes(content, headers=None):
+    """Resposta com um corpo JSON já serializado (ver api/encoding.py)."""
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def paginated_books(selection, page: Page, format, version):
+    """
+    Recorta a página pedida da seleção de livros (ver RowSelection em
+    api/pagination.py) e a devolve como lista JSON ou em streaming NDJSON, com
+    os headers de paginação.
+    """
+    start = page.start(version)
+    stop = None if page.limit is None else start + page.limit
+    total = len(selection)
+    count = max(0, (total if stop is None else min(stop, total)) - start)
+    headers = page.headers(version, start, count, total)
+    if format == "ndjson":
+        return StreamingResponse(selection.ndjson(start, stop), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+    with phase("serialization"):
+        content = selection.json_array(start, stop)
+    return json_bytes(content, headers)
 
 
 
@@ -205,43 +213,45 @@ ml_router = APIRouter(prefix="/api/v1/ml", tags=["Machine Learning"])
 
 #GET /api/v1/stats/overview: estatísticas gerais da coleção (total de livros, preço médio, distribuição de ratings).
 @endpoint_router.get("/stats/overview", response_model=OverviewStats)
-async def get_overview_stats():
-    check_data_loaded()
-    total_books = len(df_books)
-    average_price = round(df_books['price_numeric'].mean(), 2)
-    rating_dist_df = df_books['rating'].value_counts().reset_index()
-    rating_dist_df.columns = ['rating', 'count']
-    rating_distribution = rating_dist_df.sort_values(by='rating').to_dict(orient='records')
-    return {"total_books": total_books, "average_price": average_price, "rating_distribution": rating_distribution}
+async def get_overview_stats(books=Depends(get_books)):
+    # Calculadas uma vez por snapshot dos dados (ver api/stats.py)
+    return Response(content=books.stats('overview'), media_type="application/json")
 
 
 #GET /api/v1/stats/categories: estatísticas detalhadas por categoria (quantidade de livros, preços por categoria).
 @endpoint_router.get("/stats/categories", response_model=List[CategoryStat])
-async def get_category_stats():
-    check_data_loaded()
-    stats = df_books.groupby('category').agg(book_count=('id', 'count'), average_price=('price_numeric', 'mean')).reset_index()
-    stats['average_price'] = stats['average_price'].round(2)
-    return stats.to_dict(orient='records')
+async def get_category_stats(books=Depends(get_books)):
+    return Response(content=books.stats('categories'), media_type="application/json")
 
 
 #GET /api/v1/books/top-rated: lista os livros com melhor avaliação (rating mais alto).
 @endpoint_router.get("/books/top-rated", response_model=List[Book])
-async def get_top_rated_books(limit: int = Query(10, ge=1, le=50)):
-    check_data_loaded()
-    top_books = df_books[df_books['rating'] == 5].head(limit)
-    return top_books.to_dict(orient='records')
+async def get_top_rated_books(limit: int = Query(10, ge=1, le=50),
+                              min_rating: Optional[int] = Query(None, ge=1, le=5, description="Só livros com rating maior ou igual."),
+                              category: Optional[str] = Query(None, description="Só livros desta categoria."),
+                              books=Depends(get_books)):
+    # Rating decrescente, depois preço crescente e ID: uma fatia da ordem pré-calculada (ver api/rankings.py)
+    selection = books.top_rated(limit, min_rating=min_rating, category=category)
+    with phase("serialization"):
+        content = selection.json_array()
+    return json_bytes(content)
 
 
 #GET /api/v1/books/price-range?min={min}&max={max}: filtra livros dentro de uma faixa de preço específica.
 @endpoint_router.get("/books/price-range", response_model=List[Book])
-async def get_books_by_price_range(min_price: float = Query(..., ge=0), max_price: float = Query(..., ge=0)):
-    check_data_loaded()
+async def get_books_by_price_range(request: Request, min_price: float = Query(..., ge=0), max_price: float = Query(..., ge=0),
+                                   category: Optional[str] = Query(None, description="Filtra também por categoria."),
+                                   min_rating: Optional[int] = Query(None, ge=1, le=5, description="Filtra também pelo rating mínimo."),
+                                   order: Literal["id", "price_asc", "price_desc"] = Query("id", description="Ordem dos resultados."),
+                                   page: Page = Depends(), format: Literal["json", "ndjson"] = ResponseFormat,
+                                   books=Depends(get_books)):
     if min_price > max_price:
         raise HTTPException(status_code=400, detail="O preço mínimo não pode ser maior que o preço máximo.")
-    filtered_books = df_books[(df_books['price_numeric'] >= min_price) & (df_books['price_numeric'] <= max_price)]
-    if filtered_books.empty:
+    # Busca binária no índice ordenado por preço (ver api/price_index.py) ou pelo índice do banco (api/storage.py)
+    selection = books.price_range(min_price, max_price, category=category, min_rating=min_rating, order=order)
+    if len(selection) == 0:
         raise HTTPException(status_code=404, detail="Nenhum livro encontrado na faixa de preço especificada.")
-    return filtered_books.to_dict(orient='records')
+    return paginated_books(selection, page, format, request.state.data_version)
 
 
 
@@ -250,59 +260,65 @@ async def get_books_by_price_range(min_price: float = Query(..., ge=0), max_pric
 
 #GET /api/v1/books: lista todos os livros disponíveis na base de dados.
 @endpoint_router.get("/books", response_model=List[Book])
-async def get_all_books():
-    check_data_loaded()
-    return df_books.to_dict(orient='records')
+async def get_all_books(request: Request, page: Page = Depends(), format: Literal["json", "ndjson"] = ResponseFormat,
+                        books=Depends(get_books)):
+    return paginated_books(books.all_books(), page, format, request.state.data_version)
 
 
 #GET /api/v1/books/search?title={title}&category={category}: busca livros por título e/ou categoria.
 @endpoint_router.get("/books/search", response_model=List[Book])
 async def search_books(
+    request: Request,
     title: Optional[str] = Query(None, min_length=3, description="Busca livros por parte do título."), 
-    category: Optional[str] = Query(None, description="Filtra livros por uma categoria específica.")):
+    category: Optional[str] = Query(None, description="Filtra livros por uma categoria específica."),
+    match: Literal["contains", "prefix"] = Query("contains", description="'contains': o termo em qualquer parte do título; 'prefix': títulos que começam com o termo."),
+    rank: bool = Query(False, description="Ordena pela posição do termo no título (ocorrências no começo primeiro)."),
+    page: Page = Depends(), format: Literal["json", "ndjson"] = ResponseFormat,
+    books=Depends(get_books)):
 
-    check_data_loaded()
     if not title and not category:
         raise HTTPException(status_code=400, detail="Forneça 'title' ou 'category' para a busca.")
-    result_df = df_books.copy()
-    if title:
-        # Filtra por título (case-insensitive)
-        result_df = result_df[result_df['title'].str.contains(title, case=False, na=False)]
-
-    if category:
-          # Filtra por categoria (case-insensitive)
-        result_df = result_df[result_df['category'].str.lower() == category.lower()]
+    # Título e categoria são comparados sem diferenciar maiúsculas, pelo índice invertido (ver api/search.py)
+    # ou pelo índice FTS5 de trigramas do banco (api/storage.py)
+    selection = books.search(title=title or None, category=category or None, match=match, rank=rank)
 
-    if result_df.empty:
+    if len(selection) == 0:
         raise HTTPException(status_code=404, detail="Nenhum livro encontrado com os critérios fornecidos.")
     
-    return result_df.to_dict(orient='records')
+    return paginated_books(selection, page, format, request.state.data_version)
 
 
 #GET /api/v1/books/{id}: retorna detalhes completos de um livro específico pelo ID.
 @endpoint_router.get("/books/{book_id}", response_model=Book)
-async def get_book_by_id(book_id: int):
-    check_data_loaded()
-    if book_id < 0 or book_id >= len(df_books):
+async def get_book_by_id(book_id: int, books=Depends(get_books)):
+    content = books.book(book_id)
+    if content is None:
         raise HTTPException(status_code=404, detail=f"Livro com ID {book_id} não encontrado.")
-    book = df_books.loc[book_id].to_dict()
-    return book
+    return json_bytes(content)
 
 
 #GET /api/v1/categories: lista todas as categorias de livros disponíveis.
 @endpoint_router.get("/categories", response_model=List[str])
-async def get_categories():
-    check_data_loaded()
-    return df_books['category'].unique().tolist()
+async def get_categories(books=Depends(get_books)):
+    return books.categories()
 
 
 #GET /api/v1/health: verifica status da API e conectividade com os dados.
 @endpoint_router.get("/health", tags=["Status"])
 async def health_check():
-    if not df_books.empty:
-        return JSONResponse(content={"status": "ok", "data_loaded": True, "books_count": len(df_books)})
-    else:
+    # Não espera pelo carregamento dos dados: responde na hora com o estado atual
+    if book_database is not None:
+        state = book_database.state()
+        if state is not None and state[1]:
+            return JSONResponse(content={"status": "ok", "data_loaded": True, "books_count": state[1], "data_version": state[0]})
         return JSONResponse(content={"status": "error", "data_loaded": False, "message": "Dados não encontrados."}, status_code=503)
+    dataset = data_layer.dataset
+    if dataset is not None and not dataset.empty:
+        return JSONResponse(content={"status": "ok", "data_loaded": True, "books_count": len(dataset.df_books), "data_version": dataset.version})
+    if data_layer.error is None:
+        data_layer.warm_up()
+        return JSONResponse(content={"status": "ok", "data_loaded": False, "message": "Dados sendo carregados."})
+    return JSONResponse(content={"status": "error", "data_loaded": False, "message": "Dados não encontrados."}, status_code=503)
 
 
 
@@ -316,66 +332,181 @@ async def health_check():
 #POST /api/v1/auth/login - obter token.
 @auth_router.post("/login")
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
-    user = authenticate_user(fake_users_db, form_data.username, form_data.password)
+    # A verificação argon2 é cara de propósito: roda fora do event loop
+    user = await run_in_threadpool(lambda: authenticate_user(get_users_db(), form_data.username, form_data.password))
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário ou senha incorretos")
-    access_token = create_access_token(data={"sub": user["username"]})
-    refresh_token = create_refresh_token(data={"sub": user["username"]})
+    access_token = create_access_token(user["username"])
+    refresh_token = create_refresh_token(user["username"])
     return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 
 #POST /api/v1/auth/refresh - renovar token.
 @auth_router.post("/refresh")
 async def refresh_access_token(current_user: str = Depends(get_current_user_from_refresh)):
-    access_token = create_access_token(data={"sub": current_user})
+    access_token = create_access_token(current_user)
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 #Proteger endpoints de admin como /api/v1/scraping/trigger.
-@admin_router.post("/scraping/trigger")
+@admin_router.post("/scraping/trigger", status_code=status.HTTP_202_ACCEPTED)
 async def trigger_scraping(current_user: str = Depends(get_current_user)):
-    print(f"Processo de scraping disparado pelo usuário: {current_user}")
-    return {"message": "Processo de scraping iniciado com sucesso!", "triggered_by": current_user}
+    # O crawl roda em background; a resposta traz o ID do job para acompanhamento.
+    job, created = job_manager.submit(current_user)
+    if not created:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Já existe um processo de scraping em andamento (job {job.id}).")
+    return {
+        "message": "Processo de scraping iniciado com sucesso!",
+        "triggered_by": current_user,
+        "job_id": job.id,
+        "status_url": f"/api/v1/admin/scraping/jobs/{job.id}",
+    }
+
+
+#GET /api/v1/admin/scraping/jobs/{job_id} - status e progresso de um processo de scraping.
+@admin_router.get("/scraping/jobs/{job_id}")
+async def get_scraping_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} não encontrado.")
+    return job.as_dict()
+
+
+#POST /api/v1/admin/data/reload - recarrega os dados após uma nova execução do scraper.
+@admin_router.post("/data/reload")
+async def reload_data():
+    # A leitura e a montagem do novo snapshot rodam fora do event loop; as
+    # requisições em andamento continuam usando o snapshot anterior.
+    try:
+        dataset, reloaded = await run_in_threadpool(data_layer.reload)
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail="Os dados dos livros não estão disponíveis. Execute o scraper primeiro.")
+    return {"reloaded": reloaded, "data_version": dataset.version, "books_count": len(dataset.df_books)}
 
 
 
 # ------------------------------------------------------------------------------
 # --- Endpoints desafio 2: pipeline ml-ready ---
 
+#GET /api/v1/ml/vocabulary - as colunas One-Hot das categorias, na ordem usada pelo formato compacto.
+@ml_router.get("/vocabulary", response_model=List[str])
+async def get_feature_vocabulary(data: Dataset = Depends(get_dataset)):
+    return data.features.vocabulary
+
+
 #GET /api/v1/ml/features - dados formatados para features.
-@ml_router.get("/features/{book_id}", response_model=BookFeatures)
-async def get_features_for_book(book_id: int):
-    check_data_loaded()
-    if book_id not in df_ml['id'].values:
+@ml_router.get("/features/{book_id}", response_model=Union[BookFeatures, CompactBookFeatures])
+async def get_features_for_book(book_id: int,
+                                compact: bool = Query(False, description="Retorna o índice da categoria no vocabulário em vez do dict One-Hot."),
+                                data: Dataset = Depends(get_dataset)):
+    if book_id < 0 or book_id >= len(data.features):
         raise HTTPException(status_code=404, detail=f"Livro com ID {book_id} não encontrado.")
-    book_data = df_ml[df_ml['id'] == book_id].iloc[0]
-    category_features = {col: int(book_data[col]) for col in book_data.index if 'category_' in col}
-    return {"id": book_id, "price_numeric": book_data['price_numeric'], "category_features": category_features}
+    if compact:
+        return data.features.compact_features(book_id)
+    return data.features.features(book_id)
 
 
 #GET /api/v1/ml/training-data - dataset para treinamento.
-@ml_router.get("/training-data", response_model=List[TrainingDataRecord])
-async def get_training_data(limit: Optional[int] = Query(100, ge=1, le=1000)):
-    check_data_loaded()
-    records = []
-    for _, row in df_ml.head(limit).iterrows():
-        category_features = {col: int(row[col]) for col in row.index if 'category_' in col}
-        records.append({
-            "id": int(row['id']), "price_numeric": row['price_numeric'],
-            "category_features": category_features, "target_rating": int(row['rating'])
-        })
-    return records
+@ml_router.get("/training-data", response_model=Union[List[TrainingDataRecord], List[CompactTrainingDataRecord]])
+async def get_training_data(limit: Optional[int] = Query(100, ge=1, description="Quantidade de registros (sem limite máximo; para o catálogo inteiro, prefira format=ndjson)."),
+                            offset: int = Query(0, ge=0, description="Quantos registros pular."),
+                            compact: bool = Query(False, description="Retorna o índice da categoria no vocabulário em vez do dict One-Hot."),
+                            format: Literal["json", "ndjson"] = Query("json", description="'json': uma lista JSON; 'ndjson': um registro por linha, enviado em streaming."),
+                            data: Dataset = Depends(get_dataset)):
+    rows = range(len(data.features))[offset:offset + limit]
+    if format == "ndjson":
+        return ndjson_response(lambda rows: json_lines(data.features.training_records(rows, compact)), rows)
+    # Registros montados de arrays tipados: já estão no formato do modelo, sem validar linha a linha
+    records = data.features.training_records(rows, compact)
+    with phase("serialization"):
+        content = json.dumps(records, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return json_bytes(content)
+
+
+#GET /api/v1/ml/export - dataset de treinamento completo em formato binário (NPZ, Arrow ou Parquet).
+@ml_router.get("/export", response_class=StreamingResponse)
+async def export_training_data(request: Request,
+                               format: Optional[Literal["npz", "arrow", "parquet"]] = Query(None, description="Formato do arquivo; se omitido, é escolhido pelo header Accept (NPZ por padrão)."),
+                               columns: Optional[str] = Query(None, description="Colunas separadas por vírgula, entre: id, price_numeric, category_index, category_onehot, rating."),
+                               data: Dataset = Depends(get_dataset)):
+    # Importado aqui, como os dados, para não atrasar a inicialização da API (ver api/export.py)
+    from . import export
+
+    format = format or export.negotiate_format(request.headers.get("accept"))
+    if format not in export.available_formats():
+        raise HTTPException(status_code=status.HTTP_406_NOT_ACCEPTABLE, detail=f"O formato '{format}' não está disponível (requer o pacote pyarrow).")
+    try:
+        chunks = export.TrainingExport(data.features, export.parse_columns(columns)).iter_bytes(format)
+    except export.ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    media_type, extension = export.FORMATS[format]
+    headers = {"Content-Disposition": f'attachment; filename="books_ml_{data.version}.{extension}"'}
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+
+# --- Modelo de predição (ver api/model.py) ---
+@lru_cache
+def load_model():
+    # Importado aqui para que numpy só seja carregado quando o modelo for usado
+    from .model import RatingModel
+
+    return RatingModel.load()
+
+
+def preload_model():
+    try:
+        load_model()
+    except FileNotFoundError:
+        print("AVISO: Modelo de predição não encontrado. Os endpoints de predição não funcionarão.")
+
+
+def get_model():
+    """Fornece o modelo treinado offline, carregado uma única vez."""
+    try:
+        return load_model()
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail="Modelo de predição não encontrado. Treine-o com: python -m api.model")
+
+
+#GET /api/v1/ml/model - versão, vocabulário e métricas do modelo de predição.
+@ml_router.get("/model", response_model=ModelInfo)
+async def get_model_info(model=Depends(get_model)):
+    return model.info()
 
 
 #POST /api/v1/ml/predictions - endpoint para receber predições.
 @ml_router.post("/predictions", response_model=PredictionResponse)
-async def get_prediction(request: PredictionRequest):
-    price_score = 5 - (request.price_numeric / 20)
-    active_category = next((cat.replace("category_", "") for cat, val in request.category_features.items() if val == 1), "none")
-    category_bonus = 0.5 if active_category in ["Science Fiction", "Fantasy", "Mystery"] else 0
-    predicted_rating = price_score + category_bonus + random.uniform(-0.5, 0.5)
-    predicted_rating = max(1.0, min(5.0, predicted_rating))
-    return {"predicted_rating": round(predicted_rating, 2)}
+async def get_prediction(request: PredictionRequest, model=Depends(get_model)):
+    active_category = next((cat for cat, val in request.category_features.items() if val == 1), None)
+    code = model.index.get(active_category, -1)
+    return {"predicted_rating": float(model.predict([request.price_numeric], [code])[0])}
+
+
+#POST /api/v1/ml/predictions/batch - predições de vários livros em uma única passada vetorizada.
+@ml_router.post("/predictions/batch", response_model=BatchPredictionResponse, openapi_extra={
+    "requestBody": {"required": True, "content": {
+        "application/json": {"schema": BatchPredictionRequest.model_json_schema()},
+        "application/x-npz": {"schema": {"type": "string", "format": "binary"}},
+    }},
+})
+async def get_batch_predictions(request: Request, model=Depends(get_model)):
+    from .model import parse_batch
+
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+
+    def predict():
+        prices, codes = parse_batch(body, content_type, model)
+        return model.predict(prices, codes)
+
+    try:
+        predictions = await run_in_threadpool(predict)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result = {"predictions": predictions.tolist(), "model_version": model.version}
+    return json_bytes(json.dumps(result, separators=(',', ':')).encode('utf-8'))
 
 
 # ------------------------------------------------------------------------------
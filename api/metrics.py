@@ -0,0 +1,267 @@
+# ------------------------------------------------------------------------------
+# Métricas de desempenho no formato de texto do Prometheus.
+#
+# Um registro simples (contadores, gauges e histogramas com labels), sem
+# dependências externas, compartilhado pela API e pelo scraper: a API publica
+# tudo em GET /metrics e o scraper, quando roda pela linha de comando, pode
+# gravar as suas métricas em um arquivo (--metrics-file).
+#
+# O middleware RequestMetrics mede cada requisição por rota (o template, como
+# /api/v1/public/books/{book_id}, e não a URL) e separa o tempo gasto em fases:
+# 'serialization' é o tempo marcado com phase('serialization') pelos endpoints
+# e 'handler', o restante até os headers da resposta.
+# ------------------------------------------------------------------------------
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+# Limites (em segundos) dos histogramas de latência
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Registry:
+    """Conjunto de métricas publicado junto."""
+
+    def __init__(self):
+        self.metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if any(existing.name == metric.name for existing in self.metrics):
+                raise ValueError(f"Métrica '{metric.name}' já registrada.")
+            self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Todas as métricas no formato de texto do Prometheus."""
+        return ''.join(metric.render() for metric in self.metrics)
+
+
+REGISTRY = Registry()
+
+
+class Metric:
+    """
+    Base das métricas.
+
+    Args:
+        name (str): O nome da métrica.
+        documentation (str): A descrição publicada em '# HELP'.
+        labelnames (tuple): Os nomes dos labels, informados como argumentos nomeados a cada uso.
+        registry (Registry): Onde a métrica é publicada.
+    """
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        # Sem labels, a métrica já aparece zerada antes do primeiro uso
+        if not self.labelnames:
+            self._values[()] = self._initial()
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name}: labels esperados {self.labelnames}, recebidos {tuple(labels)}.")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _initial(self):
+        return 0
+
+    def _header(self):
+        return f'# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.type}\n'
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        with self._lock:
+            samples = self._samples()
+        return self._header() + ''.join(samples)
+
+
+class Counter(Metric):
+    """Valor que só cresce (requisições, bytes, erros)."""
+
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}\n'
+                for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    """Valor que pode subir ou descer (tamanho dos dados, horário da última carga)."""
+
+    type = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    """
+    Distribuição de valores (latências) em faixas acumuladas, como no Prometheus.
+
+    Args:
+        buckets (tuple): Os limites superiores das faixas, em ordem crescente.
+    """
+
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS, registry=REGISTRY):
+        self.buckets = tuple(buckets) + (float('inf'),)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _initial(self):
+        return [[0] * len(self.buckets), 0.0, 0]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = self._initial()
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Mede, em segundos, o bloco 'with'."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def _samples(self):
+        samples = []
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = 'le="' + _format_value(bound) + '"'
+                samples.append(f'{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}\n')
+            labels = _format_labels(self.labelnames, key)
+            samples.append(f'{self.name}_sum{labels} {total!r}\n')
+            samples.append(f'{self.name}_count{labels} {count}\n')
+        return samples
+
+
+# ------------------------------------------------------------------------------
+# --- Métricas das requisições HTTP ---
+
+REQUESTS = Counter('http_requests_total', "Requisições HTTP atendidas.", ('method', 'route', 'status'))
+REQUEST_DURATION = Histogram('http_request_duration_seconds',
+                             "Duração das requisições, até o fim do corpo da resposta.", ('method', 'route'))
+REQUEST_PHASES = Histogram('http_request_phase_seconds',
+                           "Tempo de cada fase das requisições (handler, serialization).", ('route', 'phase'))
+
+# Tempo acumulado por fase na requisição em andamento (ver phase())
+_current_phases = ContextVar('request_phases', default=None)
+
+
+@contextmanager
+def phase(name):
+    """Atribui o tempo do bloco 'with' a uma fase da requisição atual (sem efeito fora de uma requisição)."""
+    phases = _current_phases.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if phases is not None:
+            phases[name] = phases.get(name, 0.0) + time.perf_counter() - started
+
+
+def route_label(scope):
+    """O template da rota atendida, para que IDs e buscas não criem uma série por URL."""
+    route = scope.get('route')
+    return route.path if route is not None else 'unmatched'
+
+
+class RequestMetrics:
+    """
+    Middleware ASGI que registra, por rota, a quantidade de requisições, a
+    latência (até o último trecho do corpo, inclusive em streaming) e o tempo
+    de cada fase. Não usa app.middleware("http"), que criaria uma task e uma
+    fila por requisição: aqui o custo é só o de envolver a função send.
+
+    Uso: app.add_middleware(RequestMetrics)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        phases = {}
+        token = _current_phases.set(phases)
+        started = time.perf_counter()
+        status = 500  # Se o app falhar antes de responder
+        handler = None
+
+        async def send_with_metrics(message):
+            nonlocal status, handler
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                # 'handler': até os headers da resposta, sem o tempo já atribuído a outras fases
+                handler = time.perf_counter() - started - sum(phases.values())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _current_phases.reset(token)
+            duration = time.perf_counter() - started
+            route, method = route_label(scope), scope['method']
+            REQUESTS.inc(method=method, route=route, status=status)
+            REQUEST_DURATION.observe(duration, method=method, route=route)
+            REQUEST_PHASES.observe(max(handler if handler is not None else duration, 0.0), route=route, phase='handler')
+            for name, seconds in phases.items():
+                REQUEST_PHASES.observe(seconds, route=route, phase=name)
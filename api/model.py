@@ -0,0 +1,180 @@
+# ------------------------------------------------------------------------------
+# Modelo de predição de rating, treinado offline a partir das features de ML.
+#
+# É uma regressão linear (mínimos quadrados com regularização ridge nos pesos
+# das categorias) sobre o preço e o One-Hot da categoria. Como cada livro tem
+# uma única categoria, prever é somar o intercepto, o peso do preço vezes o
+# preço e o peso da categoria: uma única operação vetorizada para um lote
+# inteiro, sem montar a matriz One-Hot. O resultado é determinístico.
+#
+# Treino: python -m api.model (grava data/rating_model.npz, carregado pela API)
+# ------------------------------------------------------------------------------
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import zipfile
+
+import numpy as np
+
+from .dataset import DATA_DIR
+from .models import BatchPredictionRequest
+
+
+MODEL_PATH = os.path.join(DATA_DIR, 'rating_model.npz')
+MIN_RATING, MAX_RATING = 1.0, 5.0
+
+# Corpo binário das predições em lote: um NPZ com os arrays price_numeric e category_index
+NPZ_MEDIA_TYPE = 'application/x-npz'
+
+
+class RatingModel:
+    """
+    Pesos do modelo de rating.
+
+    Args:
+        intercept (float): O termo constante.
+        price_coef (float): O peso do preço.
+        category_coef (np.ndarray): O peso de cada coluna do vocabulário.
+        vocabulary (list): As colunas One-Hot ('category_<nome>'), na ordem dos pesos.
+        metrics (dict): Informações do treino (versão dos dados, linhas, erro).
+    """
+
+    def __init__(self, intercept, price_coef, category_coef, vocabulary, metrics=None):
+        self.intercept = float(intercept)
+        self.price_coef = float(price_coef)
+        self.category_coef = np.asarray(category_coef, dtype=np.float64)
+        self.vocabulary = list(vocabulary)
+        self.metrics = metrics or {}
+        self.index = {column: i for i, column in enumerate(self.vocabulary)}
+        # Peso extra no fim para categorias desconhecidas (código -1), que não somam nada
+        self._weights = np.append(self.category_coef, 0.0)
+
+        digest = hashlib.sha256()
+        digest.update(np.array([self.intercept, self.price_coef]).tobytes())
+        digest.update(self.category_coef.tobytes())
+        digest.update('\n'.join(self.vocabulary).encode('utf-8'))
+        self.version = digest.hexdigest()[:16]
+
+    @classmethod
+    def train(cls, features, l2=1.0):
+        """
+        Ajusta o modelo às features de um snapshot (ver api/features.py).
+
+        Args:
+            features (FeatureMatrix): Preço, código da categoria e rating de cada livro.
+            l2 (float): Regularização dos pesos das categorias (categorias com
+                poucos livros ficam próximas da média geral).
+        """
+        size = len(features.vocabulary)
+        prices = features.prices
+        target = features.ratings.astype(np.float64)
+        known = features.codes >= 0
+        codes, known_prices, known_target = features.codes[known], prices[known], target[known]
+
+        # Equações normais (XᵀX + penalidade) w = Xᵀy, com X = [1, preço, One-Hot], montadas
+        # a partir de somas por categoria, sem materializar a matriz One-Hot
+        counts = np.bincount(codes, minlength=size).astype(np.float64)
+        price_sums = np.bincount(codes, weights=known_prices, minlength=size)
+        gram = np.zeros((size + 2, size + 2))
+        gram[0, 0] = len(prices)
+        gram[0, 1] = gram[1, 0] = prices.sum()
+        gram[1, 1] = (prices ** 2).sum()
+        gram[0, 2:] = gram[2:, 0] = counts
+        gram[1, 2:] = gram[2:, 1] = price_sums
+        gram[2:, 2:] = np.diag(counts + l2)
+        moments = np.concatenate([[target.sum(), (prices * target).sum()],
+                                  np.bincount(codes, weights=known_target, minlength=size)])
+        weights = np.linalg.solve(gram, moments)
+
+        model = cls(weights[0], weights[1], weights[2:], features.vocabulary)
+        residuals = model.intercept + model.price_coef * prices + model._weights[features.codes] - target
+        model.metrics = {'rows': int(len(prices)), 'rmse': round(float(np.sqrt(np.mean(residuals ** 2))), 4), 'l2': l2}
+        return model
+
+    def category_codes(self, columns):
+        """Converte nomes de colunas ('category_<nome>') nos índices do vocabulário (-1 se desconhecidas)."""
+        return np.fromiter((self.index.get(column, -1) for column in columns), dtype=np.int64, count=len(columns))
+
+    def predict(self, prices, codes):
+        """
+        Prevê o rating de um lote de livros.
+
+        Args:
+            prices: O preço de cada livro.
+            codes: O índice da categoria de cada livro no vocabulário do modelo (-1 se desconhecida).
+
+        Returns:
+            np.ndarray: Os ratings previstos, entre 1 e 5, com duas casas decimais.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        codes = np.asarray(codes, dtype=np.int64)
+        if prices.ndim != 1 or prices.shape != codes.shape:
+            raise ValueError("price_numeric e category_index devem ser listas com o mesmo tamanho.")
+        if codes.size and (codes.min() < -1 or codes.max() >= len(self.vocabulary)):
+            raise ValueError(f"category_index deve estar entre -1 e {len(self.vocabulary) - 1}.")
+        scores = self.intercept + self.price_coef * prices + self._weights[codes]
+        return np.round(np.clip(scores, MIN_RATING, MAX_RATING), 2)
+
+    def save(self, path=MODEL_PATH):
+        np.savez(path, intercept=self.intercept, price_coef=self.price_coef, category_coef=self.category_coef,
+                 vocabulary=np.array(self.vocabulary), metrics=json.dumps(self.metrics))
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        """Carrega o modelo gravado por save(). Levanta FileNotFoundError se ele não existir."""
+        with np.load(path, allow_pickle=False) as f:
+            return cls(f['intercept'], f['price_coef'], f['category_coef'], f['vocabulary'].tolist(),
+                       json.loads(str(f['metrics'])))
+
+    def info(self):
+        return {'version': self.version, 'vocabulary': self.vocabulary, 'metrics': self.metrics}
+
+
+def parse_batch(body, content_type, model):
+    """
+    Lê o corpo de uma requisição de predições em lote: JSON colunar
+    (BatchPredictionRequest) ou um NPZ com os arrays 'price_numeric' e 'category_index'.
+
+    Returns:
+        tuple: (preços, índices das categorias no vocabulário do modelo).
+
+    Raises:
+        ValueError: Se o corpo não tiver os dados esperados.
+        pydantic.ValidationError: Se o JSON não seguir o modelo.
+    """
+    if content_type == NPZ_MEDIA_TYPE:
+        try:
+            loaded = np.load(io.BytesIO(body), allow_pickle=False)
+            # Um .npy avulso é carregado como um array, e não como NPZ
+            if not isinstance(loaded, np.lib.npyio.NpzFile):
+                raise ValueError
+            with loaded as f:
+                return f['price_numeric'].astype(np.float64), f['category_index'].astype(np.int64)
+        except (EOFError, KeyError, OSError, ValueError, zipfile.BadZipFile):
+            raise ValueError("O corpo não é um NPZ com os arrays 'price_numeric' e 'category_index'.")
+    request = BatchPredictionRequest.model_validate_json(body)
+    if request.category_index is not None:
+        return request.price_numeric, request.category_index
+    if request.category is not None:
+        return request.price_numeric, model.category_codes(request.category)
+    raise ValueError("Forneça 'category_index' ou 'category'.")
+
+
+if __name__ == '__main__':
+    from .data import DataLayer
+
+    parser = argparse.ArgumentParser(description="Treina o modelo de rating com as features de ML do catálogo.")
+    parser.add_argument('--output', default=MODEL_PATH, help="Arquivo do modelo.")
+    parser.add_argument('--l2', type=float, default=1.0, help="Regularização dos pesos das categorias.")
+    args = parser.parse_args()
+
+    dataset = DataLayer().get()
+    if dataset is None:
+        raise SystemExit("Dados não encontrados. Execute o scraper primeiro.")
+    model = RatingModel.train(dataset.features, l2=args.l2)
+    model.metrics['data_version'] = dataset.version
+    model.save(args.output)
+    print(f"Modelo {model.version} treinado com {model.metrics['rows']} livros (RMSE {model.metrics['rmse']}) e gravado em {args.output}.")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 
 
@@ -55,12 +55,27 @@ class BookFeatures(BaseModel):
     coluna binária (0 ou 1) para cada categoria possível.
     '''
 
+class CompactBookFeatures(BaseModel):
+    """
+    As features de um livro no formato compacto: a categoria vem como o seu índice
+    no vocabulário (GET /api/v1/ml/vocabulary), em vez do dict One-Hot completo.
+    """
+    id: int
+    price_numeric: float = Field(..., description="O preço do livro como um número float.")
+    category_index: int = Field(..., description="Posição da categoria do livro no vocabulário de features (-1 se desconhecida).")
+
 class TrainingDataRecord(BookFeatures):
     """
     Representa um registro completo para treinamento, incluindo as features e a variável alvo.
     """
     target_rating: int = Field(..., description="A variável alvo (target) que queremos prever: o rating do livro.")
 
+class CompactTrainingDataRecord(CompactBookFeatures):
+    """
+    Registro de treinamento no formato compacto.
+    """
+    target_rating: int = Field(..., description="A variável alvo (target) que queremos prever: o rating do livro.")
+
 class PredictionRequest(BaseModel):
     """
     Modelo para o corpo da requisição do endpoint de predição.
@@ -73,4 +88,28 @@ class PredictionResponse(BaseModel):
     """
     Modelo para a resposta do endpoint de predição.
     """
-    predicted_rating: float    
\ No newline at end of file
+    predicted_rating: float
+
+class BatchPredictionRequest(BaseModel):
+    """
+    Modelo para o corpo da requisição de predições em lote, em formato colunar:
+    a posição i de cada lista descreve o i-ésimo livro.
+    """
+    price_numeric: List[float] = Field(..., description="O preço de cada livro.")
+    category_index: Optional[List[int]] = Field(None, description="O índice da categoria de cada livro no vocabulário do modelo (-1 se desconhecida).")
+    category: Optional[List[str]] = Field(None, description="Alternativa a category_index: a coluna One-Hot da categoria de cada livro (ex.: 'category_Fantasy').")
+
+class BatchPredictionResponse(BaseModel):
+    """
+    Modelo para a resposta do endpoint de predições em lote.
+    """
+    predictions: List[float]
+    model_version: str
+
+class ModelInfo(BaseModel):
+    """
+    Modelo com as informações do modelo de predição carregado pela API.
+    """
+    version: str
+    vocabulary: List[str] = Field(..., description="As colunas One-Hot das categorias, na ordem de category_index.")
+    metrics: Dict[str, object]
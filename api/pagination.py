@@ -0,0 +1,133 @@
+# ------------------------------------------------------------------------------
+# Paginação e streaming das listas de livros.
+#
+# Os endpoints de listagem aceitam 'limit'/'offset' ou um cursor opaco, que
+# guarda a posição e a versão dos dados em que a paginação começou: se os dados
+# forem recarregados no meio do caminho, o cliente é avisado em vez de receber
+# páginas de snapshots diferentes.
+#
+# Com format=ndjson, a resposta é enviada aos poucos, um livro por linha, em
+# lotes serializados a partir do snapshot. A memória usada fica limitada
+# ao tamanho do lote e o primeiro byte sai sem esperar pela lista inteira.
+# ------------------------------------------------------------------------------
+
+import base64
+import binascii
+import json
+from typing import Optional
+
+from fastapi import HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from .metrics import phase
+
+
+BATCH_SIZE = 1000
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+
+def encode_cursor(version, offset):
+    payload = json.dumps({'v': version, 'o': offset}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Retorna (versão, offset) de um cursor, ou levanta HTTPException 400 se ele for inválido."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        version, offset = payload['v'], int(payload['o'])
+        if offset < 0:
+            raise ValueError(offset)
+        return version, offset
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor de paginação inválido.")
+
+
+class Page:
+    """
+    Parâmetros de paginação de uma requisição, usados como dependência dos endpoints.
+
+    Args:
+        limit (int, opcional): Quantidade máxima de itens (sem limite por padrão).
+        offset (int): Quantos itens pular.
+        cursor (str, opcional): O 'X-Next-Cursor' da página anterior; substitui o offset.
+    """
+
+    def __init__(self,
+                 limit: Optional[int] = Query(None, ge=1, description="Quantidade máxima de itens retornados."),
+                 offset: int = Query(0, ge=0, description="Quantos itens pular."),
+                 cursor: Optional[str] = Query(None, description="Cursor da próxima página (header X-Next-Cursor da resposta anterior).")):
+        self.limit = limit
+        self.offset = offset
+        self.cursor = cursor
+
+    def start(self, version):
+        """
+        A posição inicial da página nos dados de 'version'.
+
+        Raises:
+            HTTPException: 410 se o cursor for de uma versão anterior dos dados.
+        """
+        if self.cursor is None:
+            return self.offset
+        cursor_version, offset = decode_cursor(self.cursor)
+        if cursor_version != version:
+            raise HTTPException(status_code=410, detail="Os dados foram atualizados desde o início da paginação. Recomece sem o cursor.")
+        return offset
+
+    def headers(self, version, start, count, total):
+        """Headers com o total de itens e, se houver mais itens, o cursor da próxima página."""
+        headers = {'X-Total-Count': str(total)}
+        if start + count < total:
+            headers['X-Next-Cursor'] = encode_cursor(version, start + count)
+        return headers
+
+
+def json_lines(records):
+    """Serializa uma lista de registros (dicts) em NDJSON."""
+    return ''.join(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n' for record in records).encode('utf-8')
+
+
+def iter_ndjson(encode_batch, rows, batch_size=BATCH_SIZE):
+    """
+    Serializa as linhas em NDJSON, um lote por vez.
+
+    Args:
+        encode_batch: Função que recebe um lote de IDs e retorna o NDJSON (bytes) dessas linhas.
+        rows: Os IDs, na ordem da resposta.
+    """
+    for start in range(0, len(rows), batch_size):
+        with phase('serialization'):
+            chunk = encode_batch(rows[start:start + batch_size])
+        yield chunk
+
+
+def ndjson_response(encode_batch, rows, headers=None):
+    return StreamingResponse(iter_ndjson(encode_batch, rows), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+
+class RowSelection:
+    """
+    Os livros selecionados por uma consulta aos índices em memória: os IDs, na
+    ordem da resposta, e o JSON pré-serializado do snapshot. O banco SQLite
+    devolve a mesma interface (ver api/storage.py).
+
+    Args:
+        rows: Os IDs dos livros (array ou range).
+        book_json (EncodedRows): O JSON dos livros do snapshot.
+    """
+
+    def __init__(self, rows, book_json):
+        self.rows = rows
+        self.book_json = book_json
+
+    def __len__(self):
+        return len(self.rows)
+
+    def json_array(self, start=0, stop=None):
+        """Um array JSON com os livros das posições [start, stop)."""
+        return self.book_json.json_array(self.rows[start:stop])
+
+    def ndjson(self, start=0, stop=None):
+        """Os livros das posições [start, stop) em NDJSON, um lote por vez."""
+        return iter_ndjson(self.book_json.ndjson, self.rows[start:stop])
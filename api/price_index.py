@@ -0,0 +1,71 @@
+# ------------------------------------------------------------------------------
+# Índice ordenado por preço para as consultas de faixa de preço.
+#
+# Os IDs dos livros são guardados em ordem crescente de preço (argsort), junto
+# com o preço, o rating e o código da categoria de cada posição. Uma faixa de
+# preço vira duas buscas binárias (searchsorted) que delimitam uma fatia
+# contígua do índice; filtros adicionais (categoria, rating mínimo) só olham
+# essa fatia. O índice é montado uma única vez por snapshot dos dados (em
+# Dataset.prepare).
+# ------------------------------------------------------------------------------
+
+import numpy as np
+
+
+ORDER_ID = 'id'
+ORDER_PRICE_ASC = 'price_asc'
+ORDER_PRICE_DESC = 'price_desc'
+
+
+class PriceIndex:
+    """
+    Índice de preços de um snapshot do catálogo.
+
+    Args:
+        df_books: Os livros, com o ID igual à posição da linha.
+    """
+
+    def __init__(self, df_books):
+        prices = df_books['price_numeric'].to_numpy(np.float64)
+        # Ordenação estável: livros com o mesmo preço ficam na ordem dos IDs
+        self.order = np.argsort(prices, kind='stable')
+        self.prices = prices[self.order]
+        self.ratings = df_books['rating'].to_numpy(np.int64)[self.order]
+
+        codes, categories = df_books['category'].astype(str).str.lower().factorize()
+        self.category_codes = codes[self.order]
+        self.category_lookup = {category: code for code, category in enumerate(categories)}
+
+    def query(self, min_price, max_price, category=None, min_rating=None, order=ORDER_ID):
+        """
+        Busca os livros com preço entre 'min_price' e 'max_price' (inclusive).
+
+        Args:
+            category (str, opcional): Só livros desta categoria (sem diferenciar maiúsculas).
+            min_rating (int, opcional): Só livros com rating maior ou igual.
+            order (str): 'id' (ordem do catálogo), 'price_asc' ou 'price_desc'. Livros
+                com o mesmo preço ficam na ordem dos IDs ('price_desc' inverte ambos).
+
+        Returns:
+            np.ndarray: Os IDs dos livros, na ordem pedida. A paginação é feita
+            pelo endpoint (ver api/pagination.py).
+        """
+        start = np.searchsorted(self.prices, min_price, side='left')
+        stop = np.searchsorted(self.prices, max_price, side='right')
+        ids = self.order[start:stop]
+
+        mask = None
+        if category is not None:
+            code = self.category_lookup.get(category.lower(), -1)
+            mask = self.category_codes[start:stop] == code
+        if min_rating is not None:
+            rating_mask = self.ratings[start:stop] >= min_rating
+            mask = rating_mask if mask is None else mask & rating_mask
+        if mask is not None:
+            ids = ids[mask]
+
+        if order == ORDER_ID:
+            return np.sort(ids)
+        if order == ORDER_PRICE_DESC:
+            return ids[::-1]
+        return ids
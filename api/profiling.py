@@ -0,0 +1,114 @@
+# ------------------------------------------------------------------------------
+# Profiler por amostragem, ligado requisição a requisição.
+#
+# Desativado por padrão (PROFILING_ENABLED no .env). Quando ativo, uma
+# requisição com o header 'X-Profile: 1' é executada normalmente enquanto uma
+# thread captura, a cada PROFILING_INTERVAL segundos, a pilha de todas as
+# threads ocupadas (o event loop e os workers do threadpool). A resposta é
+# substituída pelas pilhas amostradas no formato "folded" (uma pilha por
+# linha, seguida da contagem), aceito por flamegraph.pl e pelo speedscope.
+#
+# Como as threads são compartilhadas, requisições simultâneas também aparecem
+# nas amostras: use em ambiente de desenvolvimento, sem outro tráfego.
+# ------------------------------------------------------------------------------
+
+import os
+import sys
+import threading
+from collections import Counter
+
+from fastapi import Request
+from fastapi.responses import Response
+
+
+PROFILE_HEADER = 'x-profile'
+
+# Funções em que uma thread está apenas esperando (sem trabalho a medir)
+IDLE_FRAMES = {
+    ('threading.py', 'wait'), ('selectors.py', 'select'), ('queue.py', 'get'),
+    ('threading.py', '_wait_for_tstate_lock'), ('thread.py', '_worker'),
+}
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f'{os.path.basename(code.co_filename)}:{getattr(code, "co_qualname", code.co_name)}'
+
+
+class SamplingProfiler:
+    """
+    Amostra periodicamente as pilhas das threads do processo.
+
+    Args:
+        interval (float): Intervalo entre amostras, em segundos.
+    """
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.samples = 0
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame))
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def folded(self):
+        """As pilhas amostradas no formato folded, da mais frequente para a menos frequente."""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class ProfileRequest:
+    """
+    Middleware HTTP que executa sob o profiler as requisições com o header
+    'X-Profile' e responde com o perfil em vez do corpo original (o status
+    original vai no header X-Profile-Status).
+
+    Args:
+        interval (float): Intervalo entre amostras, em segundos.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+
+    async def __call__(self, request: Request, call_next):
+        if request.headers.get(PROFILE_HEADER, '').lower() not in ('1', 'true'):
+            return await call_next(request)
+
+        profiler = SamplingProfiler(self.interval).start()
+        try:
+            response = await call_next(request)
+            # Consome o corpo para incluir também a serialização em streaming
+            async for _ in response.body_iterator:
+                pass
+        finally:
+            profiler.stop()
+        headers = {'X-Profile-Status': str(response.status_code), 'X-Profile-Samples': str(profiler.samples)}
+        return Response(profiler.folded(), media_type='text/plain', headers=headers)
@@ -0,0 +1,61 @@
+# ------------------------------------------------------------------------------
+# Ordenação pré-calculada dos livros mais bem avaliados.
+#
+# Os IDs ficam ordenados uma única vez por snapshot: rating decrescente, depois
+# preço crescente e, por fim, ID. Os livros com rating maior ou igual a um
+# mínimo formam um prefixo dessa ordem (encontrado por busca binária), então o
+# top-N de qualquer rating mínimo é só uma fatia. A mesma ordem é guardada por
+# categoria, para o top-N de uma categoria também ser uma fatia.
+# ------------------------------------------------------------------------------
+
+import numpy as np
+
+
+class RatingIndex:
+    """
+    Ranking por rating de um snapshot do catálogo.
+
+    Args:
+        df_books: Os livros, com o ID igual à posição da linha.
+    """
+
+    def __init__(self, df_books):
+        ratings = df_books['rating'].to_numpy(np.int64)
+        prices = df_books['price_numeric'].to_numpy(np.float64)
+        # lexsort ordena pela última chave e é estável: empates ficam na ordem dos IDs
+        self.order = np.lexsort((prices, -ratings))
+        # Ratings negados, em ordem crescente, para a busca binária do rating mínimo
+        self._keys = -ratings[self.order]
+
+        codes, categories = df_books['category'].astype(str).str.lower().factorize()
+        self.category_lookup = {category: code for code, category in enumerate(categories)}
+        # Agrupa a ordem global por categoria sem desfazer a ordem dentro de cada grupo
+        grouping = np.argsort(codes[self.order], kind='stable')
+        bounds = np.searchsorted(codes[self.order][grouping], np.arange(len(categories) + 1))
+        grouped_ids, grouped_keys = self.order[grouping], self._keys[grouping]
+        self.categories = [
+            (grouped_ids[start:stop], grouped_keys[start:stop]) for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+
+    def top(self, limit=None, min_rating=None, category=None):
+        """
+        Os livros mais bem avaliados: rating decrescente, depois preço crescente e ID.
+
+        Args:
+            limit (int, opcional): Quantidade máxima de livros.
+            min_rating (int, opcional): Só livros com rating maior ou igual.
+            category (str, opcional): Só livros desta categoria (sem diferenciar maiúsculas).
+
+        Returns:
+            np.ndarray: Os IDs dos livros, na ordem do ranking.
+        """
+        ids, keys = self.order, self._keys
+        if category is not None:
+            code = self.category_lookup.get(category.lower())
+            if code is None:
+                return self.order[:0]
+            ids, keys = self.categories[code]
+        stop = len(ids) if min_rating is None else np.searchsorted(keys, -min_rating, side='right')
+        if limit is not None:
+            stop = min(stop, limit)
+        return ids[:stop]
@@ -0,0 +1,139 @@
+# ------------------------------------------------------------------------------
+# Índice invertido para a busca de livros por título e categoria.
+#
+# Cada título (em minúsculas) é quebrado em trigramas de bytes UTF-8, e cada
+# trigrama aponta para a lista ordenada dos IDs dos livros que o contêm. Uma
+# busca intersecta as listas dos trigramas do termo, começando pela menor, e só
+# então confirma a ocorrência do termo nos poucos candidatos restantes, em vez
+# de percorrer (e copiar) o catálogo inteiro a cada requisição.
+#
+# O índice é montado uma única vez por snapshot dos dados (em Dataset.prepare).
+# ------------------------------------------------------------------------------
+
+import numpy as np
+
+
+NGRAM = 3
+
+CONTAINS = 'contains'
+PREFIX = 'prefix'
+
+# Os títulos são concatenados em um único buffer UTF-8, separados por NUL
+SEPARATOR = 0
+
+
+def normalize(text):
+    return str(text).lower()
+
+
+def ngram_codes(data):
+    """
+    Os trigramas de bytes de um texto UTF-8, cada um empacotado em um inteiro
+    de 24 bits. Trigramas que cruzam o separador entre títulos são descartados.
+
+    Returns:
+        tuple: (códigos, posição de cada trigrama no buffer).
+    """
+    data = np.asarray(data, dtype=np.int64)
+    if len(data) < NGRAM:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    codes = (data[:-2] << 16) | (data[1:-1] << 8) | data[2:]
+    valid = (data[:-2] != SEPARATOR) & (data[1:-1] != SEPARATOR) & (data[2:] != SEPARATOR)
+    return codes[valid], np.flatnonzero(valid)
+
+
+class SearchIndex:
+    """
+    Índice de busca de um snapshot do catálogo.
+
+    As listas de IDs de todos os trigramas ficam em um único array ('rows'),
+    agrupadas por trigrama; 'grams' guarda os trigramas em ordem e 'offsets' o
+    início de cada grupo, de modo que achar a lista de um trigrama é uma busca
+    binária.
+
+    Args:
+        df_books: Os livros, com o ID igual à posição da linha.
+    """
+
+    def __init__(self, df_books):
+        self.titles = [normalize(title) for title in df_books['title'].tolist()]
+        self.size = len(self.titles)
+
+        encoded = [title.encode('utf-8') for title in self.titles]
+        buffer = np.frombuffer(b'\0'.join(encoded), dtype=np.uint8)
+        lengths = np.fromiter((len(title) + 1 for title in encoded), dtype=np.int64, count=self.size)
+        codes, positions = ngram_codes(buffer)
+        row_of_byte = np.repeat(np.arange(self.size, dtype=np.int64), lengths)
+        # Ordena os pares (trigrama, livro) de uma só vez e remove os repetidos
+        pairs = np.sort((codes << 32) | row_of_byte[positions])
+        pairs = pairs[np.append(True, pairs[1:] != pairs[:-1])] if len(pairs) else pairs
+        grams = pairs >> 32
+        starts = np.flatnonzero(np.append(True, grams[1:] != grams[:-1])) if len(grams) else grams
+        self.grams = grams[starts]
+        self.offsets = np.append(starts, len(pairs))
+        self.rows = pairs & 0xFFFFFFFF
+
+        categories = df_books['category'].astype(str).str.lower()
+        self.categories = {category: np.asarray(rows, dtype=np.int64) for category, rows in categories.groupby(categories).indices.items()}
+
+    def search(self, title=None, category=None, match=CONTAINS, rank=False):
+        """
+        Busca livros por parte do título e/ou categoria, sem diferenciar maiúsculas.
+
+        Args:
+            title (str, opcional): O termo procurado no título.
+            category (str, opcional): A categoria exata.
+            match (str): 'contains' (o termo em qualquer ponto do título) ou
+                'prefix' (o título começa com o termo).
+            rank (bool): Ordena os resultados pela posição do termo no título
+                (ocorrências no começo primeiro) em vez da ordem do catálogo.
+
+        Returns:
+            np.ndarray: Os IDs (posições) dos livros encontrados.
+        """
+        rows = None
+        if category is not None:
+            rows = self.categories.get(normalize(category), np.empty(0, dtype=np.int64))
+        if title is None:
+            return rows if rows is not None else np.arange(self.size)
+
+        term = normalize(title)
+        candidates = self._candidates(term)
+        if rows is not None:
+            candidates = rows if candidates is None else np.intersect1d(candidates, rows, assume_unique=True)
+        elif candidates is None:
+            candidates = np.arange(self.size)
+
+        titles = self.titles
+        if match == PREFIX:
+            found = [row for row in candidates.tolist() if titles[row].startswith(term)]
+        else:
+            found = [row for row in candidates.tolist() if term in titles[row]]
+        if rank and match != PREFIX:
+            found.sort(key=lambda row: titles[row].find(term))
+        return np.array(found, dtype=np.int64)
+
+    def _postings(self, code):
+        i = np.searchsorted(self.grams, code)
+        if i == len(self.grams) or self.grams[i] != code:
+            return None
+        return self.rows[self.offsets[i]:self.offsets[i + 1]]
+
+    def _candidates(self, term):
+        # Termos curtos demais para ter trigramas não restringem os candidatos
+        codes, _ = ngram_codes(np.frombuffer(term.encode('utf-8'), dtype=np.uint8))
+        if len(codes) == 0:
+            return None
+        lists = []
+        for code in np.unique(codes).tolist():
+            rows = self._postings(code)
+            if rows is None:
+                return np.empty(0, dtype=np.int64)
+            lists.append(rows)
+        lists.sort(key=len)
+        candidates = lists[0]
+        for rows in lists[1:]:
+            if len(candidates) == 0:
+                break
+            candidates = np.intersect1d(candidates, rows, assume_unique=True)
+        return candidates
@@ -1,90 +1,204 @@
-from datetime import datetime, timedelta
-from typing import Optional
+# ------------------------------------------------------------------------------
+# Autenticação da API: senhas (argon2), tokens JWT de acesso e de refresh e as
+# dependências que protegem os endpoints.
+#
+# Cada token carrega o tipo ('access' ou 'refresh') nas claims: um refresh token
+# não abre endpoints protegidos e um token de acesso não renova a sessão.
+# Tokens já verificados ficam em um cache LRU limitado, indexado pelo hash do
+# token e válido até o 'exp' de cada um; requisições seguidas com o mesmo token
+# não repetem a decodificação nem a verificação da assinatura.
+# ------------------------------------------------------------------------------
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 from passlib.context import CryptContext
+
 from config import settings
 
 
 # ------------------------------------------------------------------------------
 # --- Configuração de Segurança ---
 
-# Contexto para hashing de senhas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Instância única para gerenciar a criptografia de senhas.
+# 'argon2' é o esquema padrão por ser mais robusto contra ataques de força bruta
+# em comparação com o 'bcrypt' (hashes bcrypt antigos continuam aceitos).
+pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
 
-# Esquema de autenticação que o FastAPI usará para extrair o token do header "Authorization: Bearer <token>"
+# Esquema que extrai o token do header "Authorization: Bearer <token>"
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
+
 
 # ------------------------------------------------------------------------------
-# --- Funções ---
+# --- Senhas e usuários ---
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verifica se a senha fornecida corresponde ao hash armazenado."""
+    """Verifica uma senha em plain-text contra um hash."""
     return pwd_context.verify(plain_password, hashed_password)
 
+
 def get_password_hash(password: str) -> str:
-    """Gera o hash de uma senha."""
+    """Gera o hash de uma senha usando o algoritmo padrão (argon2)."""
     return pwd_context.hash(password)
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    """Cria um novo token de acesso."""
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
-
-def create_refresh_token(data: dict):
-    """Cria um novo refresh token com uma validade mais longa."""
-    expires = timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    return create_access_token(data=data, expires_delta=expires)
-
-def decode_token(token: str) -> Optional[str]:
-    """Decodifica um token para extrair o nome de usuário."""
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            return None
-        return username
-    except JWTError:
+
+# --- Simulação de banco de dados de usuários ---
+# O hash do admin vem pronto do .env (DEFAULT_ADMIN_PASSWORD_HASH). Sem ele, o
+# hash da senha em texto é calculado uma única vez, no primeiro uso, e não no import.
+@lru_cache(maxsize=1)
+def get_users_db() -> dict:
+    hashed_password = settings.DEFAULT_ADMIN_PASSWORD_HASH or get_password_hash(settings.DEFAULT_ADMIN_PASSWORD)
+    return {
+        "admin": {
+            "username": "admin",
+            "hashed_password": hashed_password,
+            "disabled": False,
+        }
+    }
+
+
+def authenticate_user(db: dict, username: str, password: str):
+    """Autentica um usuário. Retorna os dados do usuário se for bem-sucedido, senão None."""
+    user = db.get(username)
+    if user is None or user["disabled"]:
         return None
+    if not verify_password(password, user["hashed_password"]):
+        return None
+    return user
+
+
+# ------------------------------------------------------------------------------
+# --- Tokens ---
+
+class TokenClaims(NamedTuple):
+    """As claims de um token já verificado."""
+    sub: str
+    type: str
+    exp: float  # timestamp Unix
+
+
+def _create_token(subject: str, token_type: str, expires_delta: timedelta) -> str:
+    now = datetime.now(timezone.utc)
+    claims = {"sub": subject, "type": token_type, "iat": now, "exp": now + expires_delta}
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
 
-# --- Dependência para Proteger Endpoints ---
+def create_access_token(subject: str) -> str:
+    """Cria um token de acesso, aceito pelos endpoints protegidos."""
+    return _create_token(subject, ACCESS_TOKEN, timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
 
-def get_current_user(token: str = Depends(oauth2_scheme)) -> str:
+
+def create_refresh_token(subject: str) -> str:
+    """Cria um refresh token, aceito apenas para renovar o token de acesso."""
+    return _create_token(subject, REFRESH_TOKEN, timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS))
+
+
+class TokenCache:
     """
-    Dependência para ser usada para endpoints protegidos.
-    Extrai o token, válida e retorna o nome de usuário.
-    Se o token for inválido, lança uma exceção HTTP 401.
+    Cache LRU de tokens já verificados.
+
+    A chave é o SHA-256 do token (o token em si não fica em memória) e cada
+    entrada expira junto com o token. Tokens inválidos nunca entram no cache.
+
+    Args:
+        maxsize (int): Quantidade máxima de tokens guardados (0 desativa o cache).
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    username = decode_token(token)
-    if username is None:
-        raise credentials_exception
-
-    # Como retorno desta função, o nome de usuário é retornado.
-    return username
-
-def authenticate_user(db, username, password):
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[TokenClaims]:
+        key = self.key(token)
+        with self._lock:
+            claims = self._entries.get(key)
+            if claims is not None and claims.exp <= time.time():
+                del self._entries[key]
+                claims = None
+            if claims is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return claims
+
+    def put(self, token: str, claims: TokenClaims):
+        if self.maxsize <= 0:
+            return
+        key = self.key(token)
+        with self._lock:
+            self._entries[key] = claims
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE)
+
+
+def decode_token(token: str) -> Optional[TokenClaims]:
+    """Verifica um token (assinatura, expiração e claims obrigatórias). Retorna None se ele for inválido."""
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM],
+                             options={"require": ["exp", "sub", "type"]})
+    except jwt.PyJWTError:
+        return None
+    if not isinstance(payload["sub"], str) or payload["type"] not in (ACCESS_TOKEN, REFRESH_TOKEN):
+        return None
+    claims = TokenClaims(payload["sub"], payload["type"], float(payload["exp"]))
+    token_cache.put(token, claims)
+    return claims
+
+
+# ------------------------------------------------------------------------------
+# --- Dependências para proteger endpoints ---
+
+def _require(token: str, token_type: str) -> str:
+    claims = decode_token(token)
+    if claims is None or claims.type != token_type:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token inválido",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return claims.sub
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> str:
     """
-    Busca o usuário no 'banco de dados' e verifica a senha.
+    Retorna o usuário de um token de acesso válido; 401 caso contrário.
+    Com o cache, o caso comum nem sai do event loop nem verifica a assinatura.
     """
-    if username in db:
-        user_dict = db[username]
-        if verify_password(password, user_dict["hashed_password"]):
-            return user_dict
-    return None
-
-def get_current_user_from_refresh(token: str = Depends(oauth2_scheme)) -> str:
-    # Esta função é similar à get_current_user, mas deve ser usada apenas para o endpoint de refresh.
-    return get_current_user(token)
\ No newline at end of file
+    return _require(token, ACCESS_TOKEN)
+
+
+async def get_current_user_from_refresh(token: str = Depends(oauth2_scheme)) -> str:
+    """Como get_current_user, mas aceita apenas refresh tokens (endpoint de refresh)."""
+    return _require(token, REFRESH_TOKEN)
@@ -0,0 +1,207 @@
+# ------------------------------------------------------------------------------
+# Snapshot dos dados compartilhado entre os workers da API.
+#
+# Com 'uvicorn --workers N', cada worker é um processo e, sem este módulo, lê os
+# arquivos e monta o snapshot (DataFrames, índices, JSON pré-serializado)
+# sozinho: N vezes a memória e o tempo de inicialização. Com um diretório
+# compartilhado (SHARED_DATA_DIR), só um processo por vez monta o snapshot e o
+# publica no disco: os arrays numpy (e o buffer do JSON dos livros) em arquivos
+# .npy e o restante dos objetos em um pickle que referencia esses arquivos. Os
+# demais processos carregam o pickle com os arrays mapeados em memória, somente
+# leitura, e as páginas desses arquivos ficam uma única vez na memória da
+# máquina (page cache), compartilhadas por todos os workers.
+#
+# Cada publicação de um conteúdo novo incrementa um contador de geração,
+# guardado em um arquivo de 8 bytes que cada worker mapeia em memória. Ler o
+# contador é só um acesso à memória, então cada requisição confere se há uma
+# geração mais nova e, se houver, o worker passa a usá-la antes de responder.
+# Todos os workers servem a mesma versão dos dados depois de uma recarga.
+#
+# Requer um sistema POSIX (fcntl.flock); o diretório é confiável (só a própria
+# API grava nele), já que o pickle é carregado sem restrições.
+# ------------------------------------------------------------------------------
+
+import contextlib
+import fcntl
+import json
+import mmap
+import os
+import pickle
+import shutil
+import struct
+
+
+CURRENT = 'current.json'
+COUNTER = 'generation'
+LOCK = '.lock'
+SNAPSHOT = 'dataset.pickle'
+
+# Arrays menores que isso vão dentro do próprio pickle
+MIN_SHARED_BYTES = 4096
+
+
+class _Pickler(pickle.Pickler):
+    """Grava os arrays numpy grandes em arquivos .npy separados, referenciados pelo pickle."""
+
+    def __init__(self, file, directory):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.directory = directory
+        self.arrays = 0
+
+    def persistent_id(self, obj):
+        import numpy as np
+
+        if type(obj) not in (np.ndarray, np.memmap) or obj.dtype.hasobject or obj.nbytes < MIN_SHARED_BYTES:
+            return None
+        name = f'{self.arrays}.npy'
+        self.arrays += 1
+        np.save(os.path.join(self.directory, name), obj)
+        return name
+
+
+class _Unpickler(pickle.Unpickler):
+    """Carrega o pickle com os arrays mapeados em memória, somente leitura."""
+
+    def __init__(self, file, directory):
+        super().__init__(file)
+        self.directory = directory
+
+    def persistent_load(self, name):
+        import numpy as np
+
+        return np.load(os.path.join(self.directory, name), mmap_mode='r')
+
+
+class SharedSnapshots:
+    """
+    Os snapshots publicados em um diretório compartilhado entre processos.
+
+    Nenhum arquivo é aberto até o primeiro uso.
+
+    Args:
+        directory (str): O diretório compartilhado (de preferência em um disco local ou em /dev/shm).
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._counter = None
+        self._lock_file = None
+
+    @property
+    def generation(self):
+        """A geração publicada mais recente (None antes do primeiro uso)."""
+        if self._counter is None:
+            return None
+        return struct.unpack_from('<q', self._counter)[0]
+
+    def load(self, build, signature, attached=None):
+        """
+        O snapshot publicado para os arquivos do catálogo no estado 'signature'.
+        Se ainda não houver um, monta-o com build() e o publica; enquanto isso,
+        os outros processos esperam e depois carregam o publicado.
+
+        Args:
+            build: Função que lê os arquivos e retorna um Dataset preparado.
+            signature: A assinatura atual dos arquivos (ver api/dataset.py).
+            attached (Dataset, opcional): O snapshot que o processo já usa,
+                retornado sem recarga se ainda for o publicado.
+
+        Returns:
+            Dataset: O snapshot, com o atributo 'generation' preenchido.
+        """
+        self._open()
+        signature = json.loads(json.dumps(signature))
+        current = self.current()
+        if current is None or current['signature'] != signature:
+            with self._locked():
+                current = self.current()
+                if current is None or current['signature'] != signature:
+                    dataset = build()
+                    current = self._publish(dataset, current, signature)
+                    if attached is not None and attached.generation == current['generation']:
+                        return attached
+                    dataset.generation = current['generation']
+                    return dataset
+        if attached is not None and attached.generation == current['generation']:
+            return attached
+        return self.attach(current)
+
+    def latest(self, attached=None):
+        """O snapshot da geração publicada mais recente (sem conferir os arquivos do catálogo)."""
+        self._open()
+        current = self.current()
+        if current is None or (attached is not None and attached.generation == current['generation']):
+            return attached
+        return self.attach(current)
+
+    def current(self):
+        try:
+            with open(os.path.join(self.directory, CURRENT), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def attach(self, current):
+        """Carrega uma geração publicada, com os arrays mapeados em memória."""
+        directory = os.path.join(self.directory, current['path'])
+        with open(os.path.join(directory, SNAPSHOT), 'rb') as f:
+            dataset = _Unpickler(f, directory).load()
+        dataset.generation = current['generation']
+        return dataset
+
+    def _open(self):
+        if self._counter is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock_file = open(os.path.join(self.directory, LOCK), 'a+b')
+        fd = os.open(os.path.join(self.directory, COUNTER), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            with self._locked():
+                if os.fstat(fd).st_size < 8:
+                    os.ftruncate(fd, 8)
+            self._counter = mmap.mmap(fd, 8)
+        finally:
+            os.close(fd)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _publish(self, dataset, current, signature):
+        # O mesmo conteúdo (ex.: arquivos regravados sem mudanças) mantém a geração e o snapshot publicado
+        if current is not None and current['version'] == dataset.version:
+            current['signature'] = signature
+            self._write_current(current)
+            return current
+
+        generation = (current['generation'] if current else 0) + 1
+        name = f'gen-{generation:06d}'
+        tmp_dir = os.path.join(self.directory, name + '.tmp')
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        with open(os.path.join(tmp_dir, SNAPSHOT), 'wb') as f:
+            _Pickler(f, tmp_dir).dump(dataset)
+        os.replace(tmp_dir, os.path.join(self.directory, name))
+
+        current = {'generation': generation, 'version': dataset.version, 'signature': signature, 'path': name}
+        self._write_current(current)
+        struct.pack_into('<q', self._counter, 0, generation)
+        self._cleanup(generation)
+        return current
+
+    def _write_current(self, current):
+        path = os.path.join(self.directory, CURRENT)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(current, f)
+        os.replace(path + '.tmp', path)
+
+    def _cleanup(self, generation):
+        # Mantém a geração anterior para quem leu current.json pouco antes da troca;
+        # processos que ainda usam gerações removidas continuam com os arquivos mapeados
+        for entry in os.listdir(self.directory):
+            if entry.startswith('gen-') and entry < f'gen-{generation - 1:06d}':
+                shutil.rmtree(os.path.join(self.directory, entry), ignore_errors=True)
@@ -0,0 +1,59 @@
+# ------------------------------------------------------------------------------
+# Agregados pré-calculados dos endpoints de estatísticas.
+#
+# Os dados só mudam quando um novo snapshot é carregado, então as estatísticas
+# são calculadas uma única vez por snapshot (em Dataset.prepare) e guardadas já
+# serializadas em JSON. Cada requisição custa apenas uma consulta a um dicionário;
+# uma recarga dos dados gera um novo snapshot com os seus próprios agregados.
+# ------------------------------------------------------------------------------
+
+from typing import List
+
+from pydantic import TypeAdapter
+
+from .models import CategoryStat, OverviewStats
+
+
+def rating_distribution(df_books):
+    """Quantidade de livros por rating, em ordem crescente de rating."""
+    counts = df_books['rating'].value_counts().sort_index()
+    return [{'rating': int(rating), 'count': int(count)} for rating, count in counts.items()]
+
+
+def overview_stats(df_books):
+    """Estatísticas gerais da coleção: total de livros, preço médio e distribuição de ratings."""
+    return {
+        'total_books': len(df_books),
+        'average_price': round(float(df_books['price_numeric'].mean()), 2),
+        'rating_distribution': rating_distribution(df_books),
+    }
+
+
+def category_stats(df_books):
+    """Quantidade de livros e preço médio de cada categoria, em ordem alfabética."""
+    stats = df_books.groupby('category').agg(book_count=('id', 'count'), average_price=('price_numeric', 'mean')).reset_index()
+    stats['average_price'] = stats['average_price'].round(2)
+    return stats.to_dict(orient='records')
+
+
+# Cada agregado é validado pelo mesmo modelo declarado no endpoint que o serve
+AGGREGATES = {
+    'overview': (overview_stats, TypeAdapter(OverviewStats)),
+    'categories': (category_stats, TypeAdapter(List[CategoryStat])),
+}
+
+
+def serialize(name, value):
+    """Valida um agregado pelo modelo do endpoint e o serializa em JSON (bytes)."""
+    adapter = AGGREGATES[name][1]
+    return adapter.dump_json(adapter.validate_python(value))
+
+
+def build_aggregates(df_books):
+    """
+    Calcula todos os agregados de um snapshot.
+
+    Returns:
+        dict: Nome do agregado -> corpo JSON (bytes) pronto para a resposta.
+    """
+    return {name: serialize(name, compute(df_books)) for name, (compute, _) in AGGREGATES.items()}
@@ -0,0 +1,405 @@
+# ------------------------------------------------------------------------------
+# Armazenamento do catálogo em SQLite, alternativa aos DataFrames em memória.
+#
+# Com STORAGE_BACKEND=sqlite, os endpoints de livros consultam um banco SQLite
+# em vez de manter o catálogo inteiro na memória de cada processo. A tabela
+# 'books' tem índices por categoria, rating e preço (as mesmas ordens usadas
+# pelos índices em memória) e uma tabela FTS5 com tokenizador de trigramas para
+# a busca por parte do título. Cada linha guarda também o JSON já serializado
+# do livro, então uma resposta é só a junção dos trechos lidos pelo índice.
+#
+# As leituras usam um pool de conexões somente leitura, e as listagens em
+# NDJSON percorrem o cursor em lotes: a memória fica limitada ao lote, seja
+# qual for o tamanho do catálogo. O scraper grava com upsert, identificando o
+# livro pela URL da capa: só as linhas alteradas são regravadas, e o ID de um
+# livro não muda entre execuções.
+# ------------------------------------------------------------------------------
+
+import contextlib
+import os
+import queue
+import sqlite3
+
+from .metrics import phase
+from .pagination import BATCH_SIZE
+
+
+DEFAULT_POOL_SIZE = 4
+# Maior inteiro do SQLite: valores maiores nem podem ser passados como parâmetro
+MAX_INTEGER = 2 ** 63 - 1
+
+SCHEMA = """
+PRAGMA journal_mode = WAL;
+
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    price TEXT NOT NULL,
+    price_numeric REAL NOT NULL,
+    rating INTEGER NOT NULL,
+    availability INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    image_url TEXT NOT NULL UNIQUE,
+    title_key TEXT NOT NULL,
+    category_key TEXT NOT NULL,
+    json BLOB NOT NULL
+);
+
+-- Categoria (busca, ranking e faixa de preço por categoria), ranking e faixa de preço
+CREATE INDEX IF NOT EXISTS books_category ON books (category_key, rating DESC, price_numeric, id);
+CREATE INDEX IF NOT EXISTS books_category_price ON books (category_key, price_numeric, id);
+CREATE INDEX IF NOT EXISTS books_rating ON books (rating DESC, price_numeric, id);
+CREATE INDEX IF NOT EXISTS books_price ON books (price_numeric, id);
+
+-- Busca por parte do título: índice de trigramas mantido em sincronia por triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(title, content='books', content_rowid='id', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS books_fts_insert AFTER INSERT ON books BEGIN
+    INSERT INTO books_fts (rowid, title) VALUES (new.id, new.title);
+END;
+CREATE TRIGGER IF NOT EXISTS books_fts_delete AFTER DELETE ON books BEGIN
+    INSERT INTO books_fts (books_fts, rowid, title) VALUES ('delete', old.id, old.title);
+END;
+CREATE TRIGGER IF NOT EXISTS books_fts_update AFTER UPDATE OF title ON books BEGIN
+    INSERT INTO books_fts (books_fts, rowid, title) VALUES ('delete', old.id, old.title);
+    INSERT INTO books_fts (rowid, title) VALUES (new.id, new.title);
+END;
+
+-- Versão dos dados (incrementada a cada gravação com alterações) e total de livros
+CREATE TABLE IF NOT EXISTS meta (version INTEGER NOT NULL, books INTEGER NOT NULL);
+INSERT INTO meta SELECT 0, 0 WHERE NOT EXISTS (SELECT 1 FROM meta);
+"""
+
+UPSERT = """
+INSERT INTO books (id, title, price, price_numeric, rating, availability, category, image_url, title_key, category_key, json)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    title = excluded.title, price = excluded.price, price_numeric = excluded.price_numeric,
+    rating = excluded.rating, availability = excluded.availability, category = excluded.category,
+    title_key = excluded.title_key, category_key = excluded.category_key, json = excluded.json
+WHERE books.json IS NOT excluded.json
+"""
+
+# Os campos de um livro na resposta (o modelo Book), na ordem do JSON
+BOOK_FIELDS = ['id', 'title', 'price', 'rating', 'availability', 'category', 'image_url']
+
+ORDERS = {
+    'id': 'b.id',
+    'price_asc': 'b.price_numeric, b.id',
+    'price_desc': 'b.price_numeric DESC, b.id DESC',
+    'rating': 'b.rating DESC, b.price_numeric, b.id',
+}
+
+
+def parse_price(price):
+    """Converte o preço ('£51.77') para float, como api.dataset.parse_price."""
+    return float(''.join(char for char in price if char.isdigit() or char == '.'))
+
+
+def _fts_phrase(term):
+    # O termo inteiro como uma frase FTS5: aspas internas são duplicadas
+    return '"' + term.replace('"', '""') + '"'
+
+
+class ConnectionPool:
+    """
+    Conexões somente leitura reaproveitadas entre as requisições.
+
+    Nunca bloqueia: sem conexão livre, abre uma nova, e só 'size' conexões
+    ociosas ficam abertas. Cada conexão é usada por uma thread por vez.
+    """
+
+    def __init__(self, path, size=DEFAULT_POOL_SIZE):
+        self.path = path
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        connection = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True, check_same_thread=False)
+        connection.execute('PRAGMA query_only = ON')
+        return connection
+
+    @contextlib.contextmanager
+    def connection(self):
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            connection = self._connect()
+        try:
+            yield connection
+        finally:
+            try:
+                self._idle.put_nowait(connection)
+            except queue.Full:
+                connection.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class QuerySelection:
+    """
+    Os livros selecionados por uma consulta ao banco, na ordem da resposta. Tem
+    a mesma interface de api.pagination.RowSelection.
+
+    Args:
+        pool (ConnectionPool): As conexões de leitura.
+        source (str): A cláusula FROM/WHERE da consulta (o livro é 'b').
+        params (tuple): Os parâmetros da cláusula.
+        order (str): A cláusula ORDER BY.
+        order_params (tuple): Os parâmetros da cláusula ORDER BY.
+        limit (int, opcional): Só os 'limit' primeiros livros (ex.: o top-N do ranking).
+        total (int, opcional): O total, se já conhecido (evita o COUNT).
+        dense (bool): A seleção é o catálogo inteiro em ordem de ID, e a posição
+            de cada livro é o próprio ID: a página é uma faixa de IDs, sem OFFSET.
+    """
+
+    def __init__(self, pool, source, params=(), order=ORDERS['id'], order_params=(), limit=None, total=None,
+                 dense=False):
+        self.pool = pool
+        self.source = source
+        self.params = tuple(params)
+        self.order = order
+        self.order_params = tuple(order_params)
+        self.limit = limit
+        self.dense = dense
+        self._total = total
+
+    def __len__(self):
+        if self._total is None:
+            with self.pool.connection() as connection:
+                self._total = connection.execute(f'SELECT COUNT(*) {self.source}', self.params).fetchone()[0]
+        return self._total if self.limit is None else min(self._total, self.limit)
+
+    def _select(self, connection, start, stop):
+        if self.limit is not None:
+            stop = self.limit if stop is None else min(stop, self.limit)
+        count = -1 if stop is None else max(0, stop - start)
+        # Nenhuma tabela passa do maior inteiro do SQLite: além dele, a página já seria vazia
+        start, count = min(start, MAX_INTEGER), min(count, MAX_INTEGER)
+        if self.dense:
+            # OFFSET percorre e descarta as linhas anteriores; a busca pela chave primária não
+            return connection.execute('SELECT b.json FROM books b WHERE b.id >= ? ORDER BY b.id LIMIT ?', (start, count))
+        return connection.execute(f'SELECT b.json {self.source} ORDER BY {self.order} LIMIT ? OFFSET ?',
+                                  self.params + self.order_params + (count, start))
+
+    def json_array(self, start=0, stop=None):
+        """Um array JSON com os livros das posições [start, stop)."""
+        with self.pool.connection() as connection:
+            fragments = [row[0] for row in self._select(connection, start, stop)]
+        return b'[' + b','.join(fragments) + b']'
+
+    def ndjson(self, start=0, stop=None, batch_size=BATCH_SIZE):
+        """Os livros das posições [start, stop) em NDJSON, lidos do cursor um lote por vez."""
+        with self.pool.connection() as connection:
+            cursor = self._select(connection, start, stop)
+            try:
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    with phase('serialization'):
+                        chunk = b'\n'.join(row[0] for row in rows) + b'\n'
+                    yield chunk
+            finally:
+                # Encerra a leitura mesmo se o cliente desconectar no meio do streaming
+                cursor.close()
+
+
+class BookDatabase:
+    """
+    O catálogo em um banco SQLite: gravação pelo scraper e consultas dos endpoints.
+
+    Nenhuma conexão é aberta até o primeiro uso.
+
+    Args:
+        path (str): O arquivo do banco.
+        pool_size (int): Conexões de leitura ociosas mantidas abertas.
+    """
+
+    def __init__(self, path, pool_size=DEFAULT_POOL_SIZE):
+        self.path = path
+        self.pool = ConnectionPool(path, pool_size)
+        self._derived = {}  # Nome -> (versão, valor) dos resultados que percorrem a tabela inteira
+
+    @property
+    def exists(self):
+        return os.path.exists(self.path)
+
+    # --- Gravação ---
+    def _writer(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        connection.executescript(SCHEMA)
+        return connection
+
+    def upsert_books(self, books):
+        """
+        Grava os livros extraídos pelo scraper em uma única transação. Livros
+        novos recebem o próximo ID; os já conhecidos (mesma URL da capa) só são
+        regravados se algum campo mudou.
+
+        Returns:
+            int: Quantidade de livros inseridos ou alterados.
+        """
+        from .encoding import encode_record
+
+        connection = self._writer()
+        try:
+            with connection:
+                next_id = connection.execute('SELECT COALESCE(MAX(id), -1) + 1 FROM books').fetchone()[0]
+                changed = 0
+                for book in books:
+                    row = connection.execute('SELECT id FROM books WHERE image_url = ?', (book['image_url'],)).fetchone()
+                    if row is None:
+                        book_id, next_id = next_id, next_id + 1
+                    else:
+                        book_id = row[0]
+                    record = {
+                        'id': book_id, 'title': str(book['title']), 'price': str(book['price']),
+                        'rating': int(book['rating']), 'availability': int(book['availability']),
+                        'category': str(book['category']), 'image_url': str(book['image_url']),
+                    }
+                    changed += connection.execute(UPSERT, (
+                        book_id, record['title'], record['price'], parse_price(record['price']), record['rating'],
+                        record['availability'], record['category'], record['image_url'], record['title'].lower(),
+                        record['category'].lower(), encode_record([record[field] for field in BOOK_FIELDS], BOOK_FIELDS),
+                    )).rowcount
+                if changed:
+                    connection.execute('UPDATE meta SET version = version + 1, books = (SELECT COUNT(*) FROM books)')
+            return changed
+        finally:
+            connection.close()
+
+    # --- Leitura ---
+    def state(self):
+        """(versão dos dados, total de livros), ou None se o banco ainda não existir."""
+        if not self.exists:
+            return None
+        with self.pool.connection() as connection:
+            version, books = connection.execute('SELECT version, books FROM meta').fetchone()
+        return f'db-{version}', books
+
+    def read_frame(self):
+        """
+        O catálogo inteiro como DataFrame, nas colunas do CSV do scraper (com 'id'),
+        para o snapshot em memória dos endpoints de ML. Retorna (df_books, versão).
+        """
+        import pandas as pd
+
+        with self.pool.connection() as connection:
+            version = connection.execute('SELECT version FROM meta').fetchone()[0]
+            df_books = pd.read_sql_query(
+                'SELECT id, title, price, rating, availability, category, image_url FROM books ORDER BY id', connection)
+        return df_books, f'db-{version}'
+
+    def all_books(self):
+        # Os livros nunca são removidos, então os IDs vão de 0 ao total - 1
+        return QuerySelection(self.pool, 'FROM books b', total=self.state()[1], dense=True)
+
+    def book(self, book_id):
+        """O JSON de um livro, ou None se ele não existir."""
+        if not 0 <= book_id <= MAX_INTEGER:
+            return None
+        with self.pool.connection() as connection:
+            row = connection.execute('SELECT json FROM books WHERE id = ?', (book_id,)).fetchone()
+        return row[0] if row else None
+
+    def _cached(self, name, compute):
+        # Categorias e estatísticas percorrem a tabela: calculadas uma vez por versão dos dados
+        version = self.state()[0]
+        cached = self._derived.get(name)
+        if cached is None or cached[0] != version:
+            cached = (version, compute())
+            self._derived[name] = cached
+        return cached[1]
+
+    def categories(self):
+        """As categorias, na ordem em que aparecem no catálogo."""
+        return self._cached('categories', self._categories)
+
+    def _categories(self):
+        with self.pool.connection() as connection:
+            rows = connection.execute('SELECT category FROM books GROUP BY category ORDER BY MIN(id)').fetchall()
+        return [row[0] for row in rows]
+
+    def search(self, title=None, category=None, match='contains', rank=False):
+        """Mesma busca de api.search.SearchIndex.search (sem diferenciar maiúsculas)."""
+        conditions, params = [], []
+        if title is None:
+            source = 'FROM books b'
+        else:
+            term = title.lower()
+            # O FTS5 encerra o termo no primeiro NUL, e nenhum título tem um (é o separador do formato colunar)
+            if '\0' in term:
+                return QuerySelection(self.pool, 'FROM books b WHERE 0', total=0)
+            # O índice de trigramas acha os candidatos; a comparação com title_key confirma
+            source = 'FROM books_fts f JOIN books b ON b.id = f.rowid'
+            conditions.append('books_fts MATCH ?')
+            params.append(_fts_phrase(term))
+            if match == 'prefix':
+                conditions.append('substr(b.title_key, 1, ?) = ?')
+                params += [len(term), term]
+            else:
+                conditions.append('instr(b.title_key, ?) > 0')
+                params.append(term)
+        if category is not None:
+            conditions.append('b.category_key = ?')
+            params.append(category.lower())
+        where = f"{source} WHERE {' AND '.join(conditions)}" if conditions else source
+        if title is not None and rank and match != 'prefix':
+            # Ocorrências no começo do título primeiro
+            return QuerySelection(self.pool, where, params, 'instr(b.title_key, ?), b.id', order_params=(title.lower(),))
+        return QuerySelection(self.pool, where, params)
+
+    def price_range(self, min_price, max_price, category=None, min_rating=None, order='id'):
+        """Mesma consulta de api.price_index.PriceIndex.query."""
+        conditions, params = ['b.price_numeric BETWEEN ? AND ?'], [min_price, max_price]
+        if category is not None:
+            conditions.append('b.category_key = ?')
+            params.append(category.lower())
+        if min_rating is not None:
+            conditions.append('b.rating >= ?')
+            params.append(min_rating)
+        return QuerySelection(self.pool, f"FROM books b WHERE {' AND '.join(conditions)}", params, ORDERS[order])
+
+    def top_rated(self, limit, min_rating=None, category=None):
+        """Mesma ordem de api.rankings.RatingIndex.top: rating decrescente, preço crescente e ID."""
+        conditions, params = [], []
+        if category is not None:
+            conditions.append('b.category_key = ?')
+            params.append(category.lower())
+        if min_rating is not None:
+            conditions.append('b.rating >= ?')
+            params.append(min_rating)
+        where = f"FROM books b WHERE {' AND '.join(conditions)}" if conditions else 'FROM books b'
+        return QuerySelection(self.pool, where, params, ORDERS['rating'], limit=limit)
+
+    def stats(self, name):
+        """Os agregados de api/stats.py (JSON), calculados por consultas ao banco."""
+        return self._cached(f'stats:{name}', lambda: self._stats(name))
+
+    def _stats(self, name):
+        from .stats import serialize
+
+        with self.pool.connection() as connection:
+            if name == 'overview':
+                total, average = connection.execute('SELECT COUNT(*), AVG(price_numeric) FROM books').fetchone()
+                distribution = connection.execute('SELECT rating, COUNT(*) FROM books GROUP BY rating ORDER BY rating').fetchall()
+                value = {
+                    'total_books': total,
+                    'average_price': round(average, 2),
+                    'rating_distribution': [{'rating': rating, 'count': count} for rating, count in distribution],
+                }
+            else:
+                rows = connection.execute('SELECT category, COUNT(*), AVG(price_numeric) FROM books '
+                                          'GROUP BY category ORDER BY category').fetchall()
+                value = [{'category': category, 'book_count': count, 'average_price': round(average, 2)}
+                         for category, count, average in rows]
+        return serialize(name, value)
+
+    def close(self):
+        self.pool.close()
+
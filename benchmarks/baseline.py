@@ -0,0 +1,109 @@
+# ------------------------------------------------------------------------------
+# Resultados de referência dos benchmarks (benchmarks/baseline.json).
+#
+# Cada benchmark grava os seus resultados por tamanho de catálogo e compara a
+# execução atual com a referência salva. Métricas de vazão ('*_per_second')
+# regridem quando caem, e latências ('*_ms'), quando sobem, além da tolerância.
+# Os números dependem da máquina: gere a referência no mesmo ambiente em que
+# as comparações vão rodar (--save-baseline).
+# ------------------------------------------------------------------------------
+
+import json
+import os
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_TOLERANCE = 0.2
+# Vazão ('*_per_second') e latência ('*_ms'); as demais métricas são só informativas
+JUDGED_SUFFIXES = ('_per_second', '_ms')
+
+
+def percentile(values, q):
+    """O percentil 'q' (0 a 100) de uma lista de valores, por interpolação linear."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def load(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save(benchmark, size, results, path=BASELINE_PATH):
+    """Grava 'results' ({cenário: métricas}) como a referência do benchmark para o tamanho de catálogo 'size'."""
+    baseline = load(path)
+    baseline.setdefault(benchmark, {}).setdefault(str(size), {}).update(results)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def _regressed(metric, current, reference, tolerance):
+    if metric.endswith('_per_second'):
+        return current < reference * (1 - tolerance)
+    if metric.endswith('_ms'):
+        return current > reference * (1 + tolerance)
+    return False
+
+
+def compare(benchmark, size, results, tolerance=DEFAULT_TOLERANCE, path=BASELINE_PATH):
+    """
+    Compara os resultados com a referência salva.
+
+    Args:
+        results (dict): {cenário: {métrica: valor}}.
+
+    Returns:
+        tuple: (linhas do relatório, quantidade de regressões), ou (None, 0) se
+        não houver referência para este benchmark e tamanho.
+    """
+    reference = load(path).get(benchmark, {}).get(str(size))
+    if reference is None:
+        return None, 0
+    lines, regressions = [], 0
+    for scenario, metrics in results.items():
+        for metric, current in metrics.items():
+            expected = reference.get(scenario, {}).get(metric)
+            if not metric.endswith(JUDGED_SUFFIXES) or not expected:
+                continue
+            change = (current - expected) / expected * 100
+            regressed = _regressed(metric, current, expected, tolerance)
+            regressions += regressed
+            flag = '  <-- REGRESSÃO' if regressed else ''
+            lines.append(f"{scenario:<20} {metric:<22} {expected:>12.2f} -> {current:>12.2f} ({change:+.1f}%){flag}")
+    return lines, regressions
+
+
+def report(benchmark, size, results, args):
+    """
+    Imprime a comparação com a referência e, com --save-baseline, atualiza a
+    referência. Retorna o código de saída do processo (1 se houver regressão
+    com --check).
+    """
+    if args.save_baseline:
+        save(benchmark, size, results)
+        print(f"Referência atualizada em {BASELINE_PATH}.")
+        return 0
+    lines, regressions = compare(benchmark, size, results, args.tolerance)
+    if lines is None:
+        print(f"Sem referência para '{benchmark}' com {size} livros (use --save-baseline para criar).")
+        return 0
+    print(f"\nComparação com a referência (tolerância de {args.tolerance:.0%}):")
+    print('\n'.join(lines))
+    print(f"{regressions} regressões encontradas.")
+    return 1 if regressions and args.check else 0
+
+
+def add_arguments(parser):
+    """Opções de comparação comuns a todos os benchmarks."""
+    parser.add_argument('--save-baseline', action='store_true', help="Grava os resultados como a nova referência.")
+    parser.add_argument('--check', action='store_true', help="Sai com erro se houver regressão (para CI).")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Variação aceita em relação à referência (0.2 = 20%%).")
@@ -0,0 +1,196 @@
+# ------------------------------------------------------------------------------
+# Benchmark de carga da API com o catálogo sintético (benchmarks/catalogue.py).
+#
+# Gera os dados (CSV + formato colunar) com N livros em um diretório
+# temporário, sobe a API com o uvicorn em outro processo e dispara requisições
+# concorrentes, por alguns segundos, contra cada cenário: listagem, ranking, busca,
+# faixa de preço, estatísticas e endpoints de ML. Reporta req/s, p50 e p99 de
+# cada cenário e compara com a referência salva (benchmarks/baseline.json).
+# Com --storage sqlite, os dados vão para um banco SQLite e a API roda com
+# STORAGE_BACKEND=sqlite (ver api/storage.py).
+#
+# Uso: python benchmarks/bench_api.py [--books 1000] [--duration 3] [--concurrency 8] [--storage sqlite] [--check]
+# ------------------------------------------------------------------------------
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import aiohttp
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from api.dataset import write_columnar  # noqa: E402
+from api.storage import BookDatabase  # noqa: E402
+from benchmarks import baseline  # noqa: E402
+from benchmarks.catalogue import CATEGORIES, WORDS, free_port, synthetic_books  # noqa: E402
+from scripts.scraper import save_books  # noqa: E402
+
+
+# A API lendo os dados do diretório do benchmark em vez de data/
+SERVER_CODE = """
+import sys, uvicorn
+import api.main as main
+main.data_layer.csv_path, main.data_layer.columnar_dir = sys.argv[1], sys.argv[2]
+uvicorn.run(main.app, host='127.0.0.1', port=int(sys.argv[3]), log_level='warning', access_log=False)
+"""
+
+# Variáveis obrigatórias de config.py, caso não haja um .env
+DEFAULT_ENV = {'SECRET_KEY': 'benchmark', 'DEFAULT_ADMIN_PASSWORD': 'benchmark', 'DATA_WATCH_INTERVAL': '0'}
+
+SEARCH_TERMS = [word for word in WORDS if len(word) >= 3]
+
+
+# --- Cenários: cada um gera (método, caminho, corpo JSON) a partir de um gerador aleatório ---
+def _price_range(rng, books):
+    low = round(rng.uniform(10, 55), 2)
+    return 'GET', f'/api/v1/public/books/price-range?min_price={low}&max_price={low + 2}&limit=50', None
+
+
+def _prediction(rng, books):
+    body = {'price_numeric': round(rng.uniform(10, 60), 2), 'category_features': {f'category_{rng.choice(CATEGORIES)}': 1}}
+    return 'POST', '/api/v1/ml/predictions', body
+
+
+SCENARIOS = {
+    'books': lambda rng, books: ('GET', f'/api/v1/public/books?limit=50&offset={rng.randrange(books)}', None),
+    'book_by_id': lambda rng, books: ('GET', f'/api/v1/public/books/{rng.randrange(books)}', None),
+    'top_rated': lambda rng, books: ('GET', f'/api/v1/public/books/top-rated?limit=50&min_rating={rng.randint(1, 5)}'
+                                            f'&category={rng.choice(CATEGORIES)}', None),
+    'search': lambda rng, books: ('GET', f'/api/v1/public/books/search?title={rng.choice(SEARCH_TERMS)}&limit=50', None),
+    'price_range': _price_range,
+    'stats_overview': lambda rng, books: ('GET', '/api/v1/public/stats/overview', None),
+    'stats_categories': lambda rng, books: ('GET', '/api/v1/public/stats/categories', None),
+    'ml_features': lambda rng, books: ('GET', f'/api/v1/ml/features/{rng.randrange(books)}', None),
+    'ml_training_data': lambda rng, books: ('GET', f'/api/v1/ml/training-data?limit=100&offset={rng.randrange(books)}', None),
+    'ml_predictions': _prediction,
+}
+
+
+def write_dataset(books, directory):
+    """Grava o catálogo sintético no formato do scraper. Retorna (CSV, diretório colunar)."""
+    csv_path = os.path.join(directory, 'books.csv')
+    columnar_dir = os.path.join(directory, 'books_columnar')
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = save_books(synthetic_books(books), csv_path)
+        write_columnar(df, columnar_dir, source_path=csv_path)
+    return csv_path, columnar_dir
+
+
+def write_database(books, directory):
+    """Grava o catálogo sintético em um banco SQLite, como o scraper com --database. Retorna o caminho."""
+    database_path = os.path.join(directory, 'books.db')
+    database = BookDatabase(database_path)
+    database.upsert_books(synthetic_books(books))
+    database.close()
+    return database_path
+
+
+@contextlib.contextmanager
+def api_server(csv_path, columnar_dir, timeout, database_path=None):
+    """Sobe a API em outro processo e espera os dados serem carregados."""
+    port = free_port()
+    env = {**DEFAULT_ENV, **os.environ, 'PRELOAD_DATA': 'true'}
+    if database_path:
+        env.update(STORAGE_BACKEND='sqlite', DATABASE_PATH=database_path)
+    process = subprocess.Popen([sys.executable, '-c', SERVER_CODE, csv_path, columnar_dir, str(port)],
+                               cwd=ROOT_DIR, env=env)
+    url = f'http://127.0.0.1:{port}'
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                with urllib.request.urlopen(url + '/api/v1/public/health', timeout=1) as response:
+                    if json.load(response).get('data_loaded'):
+                        break
+            except OSError:
+                pass
+            if time.monotonic() > deadline or process.poll() is not None:
+                raise RuntimeError("A API não carregou os dados a tempo.")
+            time.sleep(0.1)
+        yield url
+    finally:
+        process.terminate()
+        process.wait()
+
+
+async def _worker(session, url, scenario, books, rng, deadline, latencies, errors):
+    while time.perf_counter() < deadline:
+        method, path, body = scenario(rng, books)
+        started = time.perf_counter()
+        async with session.request(method, url + path, json=body) as response:
+            await response.read()
+            status = response.status
+        latencies.append(time.perf_counter() - started)
+        if status != 200:
+            errors.append(status)
+
+
+async def _load(session, url, scenario, books, duration, concurrency, seed):
+    latencies, errors = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _worker(session, url, scenario, books, random.Random(seed + i), started + duration, latencies, errors)
+        for i in range(concurrency)
+    ))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def measure(url, name, books, duration, concurrency, warm_up=0.5, seed=0):
+    """Dispara requisições de um cenário por 'duration' segundos e resume as latências."""
+    scenario = SCENARIOS[name]
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        # Aquecimento: abre as conexões e preenche os caches antes da medição
+        await _load(session, url, scenario, books, warm_up, concurrency, seed)
+        latencies, errors, elapsed = await _load(session, url, scenario, books, duration, concurrency, seed)
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(baseline.percentile(latencies, 50) * 1000, 3),
+        'p99_ms': round(baseline.percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def run(books, scenarios, duration, concurrency, storage='memory', timeout=600):
+    with tempfile.TemporaryDirectory(prefix='bench_api_') as directory:
+        csv_path, columnar_dir = write_dataset(books, directory)
+        database_path = write_database(books, directory) if storage == 'sqlite' else None
+        with api_server(csv_path, columnar_dir, timeout, database_path) as url:
+            return {name: asyncio.run(measure(url, name, books, duration, concurrency)) for name in scenarios}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Mede latência e vazão da API com um catálogo sintético.")
+    parser.add_argument('--books', type=int, default=1000, help="Tamanho do catálogo (ex.: 1000, 100000, 1000000).")
+    parser.add_argument('--duration', type=float, default=3.0, help="Segundos de carga por cenário.")
+    parser.add_argument('--concurrency', type=int, default=8, help="Requisições simultâneas.")
+    parser.add_argument('--storage', default='memory', choices=['memory', 'sqlite'],
+                        help="Backend dos endpoints de livros (STORAGE_BACKEND).")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f"Cenários separados por vírgula (padrão: todos): {', '.join(SCENARIOS)}.")
+    baseline.add_arguments(parser)
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Cenários desconhecidos: {', '.join(unknown)}.")
+
+    results = run(args.books, scenarios, args.duration, args.concurrency, args.storage)
+    print(f"{'cenário':<20} {'req/s':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'erros':>7}")
+    for name, result in results.items():
+        print(f"{name:<20} {result['requests_per_second']:>10} {result['p50_ms']:>10} {result['p99_ms']:>10} {result['errors']:>7}")
+    benchmark = 'api' if args.storage == 'memory' else f'api_{args.storage}'
+    sys.exit(baseline.report(benchmark, args.books, results, args))
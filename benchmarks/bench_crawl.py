@@ -0,0 +1,60 @@
+# ------------------------------------------------------------------------------
+# Benchmark do crawl completo contra o catálogo sintético (benchmarks/catalogue.py).
+#
+# Mede, de ponta a ponta e sem acesso à internet, quantos livros por segundo o
+# scraper extrai: o crawl sequencial (scrape_all_books) e, com --async, o crawl
+# concorrente. O servidor roda em outro processo, e os livros extraídos são
+# conferidos com os livros do catálogo.
+#
+# Uso: python benchmarks/bench_crawl.py [--books 1000] [--async] [--check]
+# ------------------------------------------------------------------------------
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks import baseline  # noqa: E402
+from benchmarks.catalogue import CatalogueProcess  # noqa: E402
+from scripts.parsers import get_parser  # noqa: E402
+from scripts.scraper import scrape_all_books, scrape_all_books_async  # noqa: E402
+
+
+def crawl(server, use_async, concurrency, parser):
+    if use_async:
+        return asyncio.run(scrape_all_books_async(server.base_url, concurrency=concurrency, parser=parser))
+    return scrape_all_books(server.base_url, parser=parser)
+
+
+def run(books, use_async=False, concurrency=16, parser='auto'):
+    """Executa um crawl completo e retorna o tempo e a vazão."""
+    with CatalogueProcess(books) as server:
+        started = time.perf_counter()
+        # O scraper imprime uma linha por página; aqui só interessa o tempo
+        with contextlib.redirect_stdout(io.StringIO()):
+            scraped = crawl(server, use_async, concurrency, get_parser(parser))
+        elapsed = time.perf_counter() - started
+        if scraped != server.expected_books():
+            raise SystemExit(f"ERRO: o crawl extraiu {len(scraped)} livros diferentes dos {books} do catálogo.")
+    return {'books': books, 'seconds': round(elapsed, 3), 'books_per_second': round(books / elapsed, 1)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Mede a vazão do scraper contra um catálogo sintético local.")
+    parser.add_argument('--books', type=int, default=1000, help="Tamanho do catálogo (ex.: 1000, 100000, 1000000).")
+    parser.add_argument('--async', dest='use_async', action='store_true', help="Mede o crawl concorrente.")
+    parser.add_argument('--concurrency', type=int, default=16, help="Requisições simultâneas no modo --async.")
+    parser.add_argument('--parser', default='auto', choices=['auto', 'bs4', 'lxml'], help="Backend de parsing.")
+    baseline.add_arguments(parser)
+    args = parser.parse_args()
+
+    scenario = 'scrape_all_books_async' if args.use_async else 'scrape_all_books'
+    result = run(args.books, args.use_async, args.concurrency, args.parser)
+    print(f"{scenario}: {result['books']} livros em {result['seconds']} s ({result['books_per_second']} livros/s)")
+    sys.exit(baseline.report('crawl', args.books, {scenario: result}, args))
@@ -0,0 +1,81 @@
+# ------------------------------------------------------------------------------
+# Benchmark das predições do modelo de rating.
+#
+# Compara, no mesmo processo e sem o overhead de HTTP:
+#   - single: um livro por chamada, como no POST /api/v1/ml/predictions;
+#   - batch_json / batch_npz: o caminho do POST /api/v1/ml/predictions/batch
+#     (leitura do corpo + predição vetorizada), com o corpo em JSON ou em NPZ.
+# Os resultados são em livros previstos por segundo (mediana das execuções).
+#
+# Uso: python benchmarks/bench_predictions.py [--rows 100000] [--runs 5]
+# ------------------------------------------------------------------------------
+
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from api.model import NPZ_MEDIA_TYPE, RatingModel, parse_batch  # noqa: E402
+
+SINGLE_ROWS = 2000
+
+
+def synthetic_batch(model, rows, seed=0):
+    """Preços e categorias aleatórios (mas reprodutíveis) no vocabulário do modelo."""
+    rng = np.random.default_rng(seed)
+    prices = np.round(rng.uniform(10, 60, rows), 2)
+    codes = rng.integers(0, len(model.vocabulary), rows)
+    return prices, codes
+
+
+def median_rate(function, rows, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return round(rows / statistics.median(timings))
+
+
+def run(rows, runs):
+    model = RatingModel.load()
+    prices, codes = synthetic_batch(model, rows)
+
+    json_body = json.dumps({'price_numeric': prices.tolist(), 'category_index': codes.tolist()}).encode()
+    buffer = io.BytesIO()
+    np.savez(buffer, price_numeric=prices, category_index=codes)
+    npz_body = buffer.getvalue()
+
+    def single():
+        for price, code in zip(prices[:SINGLE_ROWS].tolist(), codes[:SINGLE_ROWS].tolist()):
+            model.predict([price], [code])
+
+    # As três formas têm que dar o mesmo resultado
+    expected = model.predict(prices, codes)
+    assert np.array_equal(model.predict(*parse_batch(json_body, 'application/json', model)), expected)
+    assert np.array_equal(model.predict(*parse_batch(npz_body, NPZ_MEDIA_TYPE, model)), expected)
+
+    return {
+        'single': median_rate(single, SINGLE_ROWS, runs),
+        'batch_json': median_rate(lambda: model.predict(*parse_batch(json_body, 'application/json', model)), rows, runs),
+        'batch_npz': median_rate(lambda: model.predict(*parse_batch(npz_body, NPZ_MEDIA_TYPE, model)), rows, runs),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Mede a vazão das predições de rating, uma a uma e em lote.")
+    parser.add_argument('--rows', type=int, default=100000, help="Livros por lote.")
+    parser.add_argument('--runs', type=int, default=5, help="Execuções medidas.")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.runs)
+    for name, rate in results.items():
+        print(f"{name}: {rate:,} livros/s")
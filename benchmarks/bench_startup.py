@@ -0,0 +1,63 @@
+# ------------------------------------------------------------------------------
+# Benchmark do tempo de inicialização da API.
+#
+# Cada medição roda em um processo Python novo, como em um cold start:
+#   - import: tempo para importar api.main (o que o servidor faz antes de aceitar requisições);
+#   - first_data: tempo para carregar o catálogo no primeiro uso, após o import.
+#
+# Uso: python benchmarks/bench_startup.py [--runs 10]
+# ------------------------------------------------------------------------------
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MEASURE_CODE = """
+import json, sys, time
+started = time.perf_counter()
+import api.main
+imported = time.perf_counter()
+pandas_on_import = 'pandas' in sys.modules
+api.main.data_layer.get()
+loaded = time.perf_counter()
+print(json.dumps({'import': imported - started, 'first_data': loaded - imported, 'pandas_on_import': pandas_on_import}))
+"""
+
+# Variáveis obrigatórias de config.py, caso não haja um .env
+DEFAULT_ENV = {'SECRET_KEY': 'benchmark', 'DEFAULT_ADMIN_PASSWORD': 'benchmark', 'PRELOAD_DATA': 'false'}
+
+
+def measure_once():
+    env = {**DEFAULT_ENV, **os.environ}
+    output = subprocess.run(
+        [sys.executable, '-c', MEASURE_CODE], cwd=ROOT_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(runs):
+    """Executa o benchmark e retorna a mediana, em milissegundos, de cada fase."""
+    samples = [measure_once() for _ in range(runs)]
+    results = {
+        phase: round(statistics.median(sample[phase] for sample in samples) * 1000, 1)
+        for phase in ('import', 'first_data')
+    }
+    results['pandas_on_import'] = any(sample['pandas_on_import'] for sample in samples)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Mede o tempo de import da API e do primeiro carregamento dos dados.")
+    parser.add_argument('--runs', type=int, default=10, help="Número de processos medidos.")
+    args = parser.parse_args()
+
+    results = run(args.runs)
+    print(f"import api.main: {results['import']} ms (mediana de {args.runs} execuções)")
+    print(f"primeiro carregamento dos dados: {results['first_data']} ms")
+    if results['pandas_on_import']:
+        print("AVISO: pandas foi importado junto com api.main.")
@@ -0,0 +1,369 @@
+# ------------------------------------------------------------------------------
+# Catálogo sintético no layout do books.toscrape.com, servido localmente.
+#
+# Os livros são gerados de forma determinística a partir do ID (o mesmo ID
+# sempre gera o mesmo livro), então um catálogo de 1k, 100k ou 1M livros não
+# ocupa disco: as páginas de listagem e de detalhes são montadas a cada
+# requisição. O scraper roda contra o servidor sem acesso à internet, e os
+# benchmarks da API usam os mesmos livros como dados (synthetic_books).
+#
+# Uso: python benchmarks/catalogue.py --books 100000 --port 8002
+# ------------------------------------------------------------------------------
+
+import argparse
+import hashlib
+import html
+import random
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+BOOKS_PER_PAGE = 20
+SITE_URL = 'https://books.toscrape.com/'
+
+# As categorias do site original
+CATEGORIES = (
+    'Academic', 'Add a comment', 'Adult Fiction', 'Art', 'Autobiography', 'Biography', 'Business', 'Childrens',
+    'Christian', 'Christian Fiction', 'Classics', 'Contemporary', 'Crime', 'Cultural', 'Default', 'Erotica',
+    'Fantasy', 'Fiction', 'Food and Drink', 'Health', 'Historical', 'Historical Fiction', 'History', 'Horror',
+    'Humor', 'Music', 'Mystery', 'New Adult', 'Nonfiction', 'Novels', 'Paranormal', 'Parenting', 'Philosophy',
+    'Poetry', 'Politics', 'Psychology', 'Religion', 'Romance', 'Science', 'Science Fiction', 'Self Help',
+    'Sequential Art', 'Short Stories', 'Spirituality', 'Sports and Games', 'Suspense', 'Thriller', 'Travel',
+    'Womens Fiction', 'Young Adult',
+)
+
+WORDS = (
+    'the', 'a', 'of', 'and', 'in', 'light', 'attic', 'velvet', 'night', 'house', 'girl', 'secret', 'world',
+    'life', 'love', 'war', 'dark', 'city', 'book', 'river', 'king', 'queen', 'last', 'first', 'black', 'white',
+    'red', 'blood', 'star', 'time', 'story', 'history', 'guide', 'art', 'music', 'shadow', 'fire', 'water',
+    'stone', 'heart', 'dream', 'garden', 'summer', 'winter', 'road', 'sea', 'sky', 'song', 'mystery', 'death',
+    'little', 'great', 'new', 'old', 'lost', 'wild', 'silent', 'golden', 'hidden', 'broken', 'café', 'naïve',
+)
+
+RATINGS = ('One', 'Two', 'Three', 'Four', 'Five')
+
+
+def synthetic_book(book_id, site_url=SITE_URL):
+    """
+    O livro 'book_id' do catálogo, no mesmo formato retornado pelo scraper.
+
+    Args:
+        site_url (str): A raiz do site, usada na URL da imagem.
+    """
+    rng = random.Random(book_id)
+    words = [rng.choice(WORDS) for _ in range(rng.randint(2, 5))]
+    title = ' '.join(words).capitalize() + f' {book_id}'
+    image = hashlib.md5(str(book_id).encode('ascii')).hexdigest()
+    return {
+        'title': title,
+        'price': f'£{rng.uniform(10, 60):.2f}',
+        'rating': rng.randint(1, 5),
+        'availability': str(rng.randint(1, 22)),
+        'category': rng.choice(CATEGORIES),
+        'image_url': f'{site_url}media/cache/{image[:2]}/{image[2:4]}/{image}.jpg',
+    }
+
+
+def synthetic_books(books, site_url=SITE_URL):
+    """Os 'books' primeiros livros do catálogo, na ordem do crawl."""
+    return [synthetic_book(book_id, site_url) for book_id in range(books)]
+
+
+def book_slug(book_id, title):
+    return re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-') + f'_{book_id}'
+
+
+# ------------------------------------------------------------------------------
+# --- Páginas ---
+
+LISTING_ITEM = """
+        <li class="col-xs-6 col-sm-4 col-md-3 col-lg-3">
+    <article class="product_pod">
+            <div class="image_container">
+                    <a href="{slug}/index.html"><img src="../{image}" alt="{title}" class="thumbnail"></a>
+            </div>
+                <p class="star-rating {rating}">
+                    <i class="icon-star"></i>
+                </p>
+            <h3><a href="{slug}/index.html" title="{title}">{title}</a></h3>
+            <div class="product_price">
+        <p class="price_color">{price}</p>
+<p class="instock availability">
+    <i class="icon-ok"></i>
+        In stock
+</p>
+            </div>
+    </article>
+</li>"""
+
+LISTING_PAGE = """<!DOCTYPE html>
+<html lang="en-us" class="no-js">
+    <head>
+        <title>All products | Books to Scrape - Sandbox</title>
+        <meta http-equiv="content-type" content="text/html; charset=UTF-8" />
+    </head>
+    <body id="default" class="default">
+<div class="container-fluid page">
+    <div class="page_inner">
+    <ul class="breadcrumb">
+        <li><a href="../index.html">Home</a></li>
+        <li class="active">All products</li>
+    </ul>
+                <div class="page-header action"><h1>All products</h1></div>
+                <section>
+                    <div>
+                        <ol class="row">{items}
+                        </ol>
+                        <div>
+                            <ul class="pager">
+        <li class="current">
+            Page {page} of {pages}
+        </li>{next}
+                            </ul>
+                        </div>
+                    </div>
+                </section>
+    </div>
+</div>
+    </body>
+</html>
+"""
+
+BOOK_PAGE = """<!DOCTYPE html>
+<html lang="en-us" class="no-js">
+    <head>
+        <title>{title} | Books to Scrape - Sandbox</title>
+        <meta http-equiv="content-type" content="text/html; charset=UTF-8" />
+    </head>
+    <body id="default" class="default">
+<div class="container-fluid page">
+    <div class="page_inner">
+    <ul class="breadcrumb">
+        <li><a href="../../index.html">Home</a></li>
+        <li><a href="../category/books_1/index.html">Books</a></li>
+        <li><a href="../category/books/{category_slug}/index.html">{category}</a></li>
+        <li class="active">{title}</li>
+    </ul>
+<article class="product_page">
+    <div class="row">
+        <div class="col-sm-6">
+    <div id="product_gallery" class="carousel">
+        <div class="thumbnail"><div class="carousel-inner"><div class="item active">
+            <img src="../../{image}" alt="{title}" />
+        </div></div></div>
+    </div>
+        </div>
+        <div class="col-sm-6 product_main">
+    <h1>{title}</h1>
+<p class="price_color">{price}</p>
+<p class="instock availability">
+    <i class="icon-ok"></i>
+        In stock ({availability} available)
+</p>
+    <p class="star-rating {rating}">
+        <i class="icon-star"></i>
+    </p>
+        </div>
+    </div>
+    <div id="product_description" class="sub-header"><h2>Product Description</h2></div>
+    <p>{description}</p>
+    <div class="sub-header"><h2>Product Information</h2></div>
+    <table class="table table-striped">
+        <tr><th>UPC</th><td>{upc}</td></tr>
+        <tr><th>Product Type</th><td>Books</td></tr>
+        <tr><th>Price (excl. tax)</th><td>{price}</td></tr>
+        <tr><th>Price (incl. tax)</th><td>{price}</td></tr>
+        <tr><th>Tax</th><td>£0.00</td></tr>
+        <tr><th>Availability</th><td>In stock ({availability} available)</td></tr>
+        <tr><th>Number of reviews</th><td>0</td></tr>
+    </table>
+</article>
+    </div>
+</div>
+    </body>
+</html>
+"""
+
+
+def _page_fields(book_id):
+    book = synthetic_book(book_id)
+    return {
+        'slug': book_slug(book_id, book['title']),
+        'title': html.escape(book['title']),
+        'price': book['price'],
+        'rating': RATINGS[book['rating'] - 1],
+        'availability': book['availability'],
+        'category': html.escape(book['category']),
+        'category_slug': book_slug(CATEGORIES.index(book['category']) + 2, book['category']),
+        'image': book['image_url'][len(SITE_URL):],
+        'upc': book['image_url'][-20:-4],
+    }
+
+
+def listing_page(page, books):
+    """A página de listagem 'page' (a partir de 1) de um catálogo com 'books' livros."""
+    pages = max(1, -(-books // BOOKS_PER_PAGE))
+    first = (page - 1) * BOOKS_PER_PAGE
+    items = ''.join(LISTING_ITEM.format(**_page_fields(book_id))
+                    for book_id in range(first, min(first + BOOKS_PER_PAGE, books)))
+    next_link = f'\n            <li class="next"><a href="page-{page + 1}.html">next</a></li>' if page < pages else ''
+    return LISTING_PAGE.format(items=items, page=page, pages=pages, next=next_link)
+
+
+def book_page(book_id):
+    fields = _page_fields(book_id)
+    # Descrição com o tamanho típico do site original
+    fields['description'] = ' '.join(random.Random(-book_id).choices(WORDS, k=150))
+    return BOOK_PAGE.format(**fields)
+
+
+# ------------------------------------------------------------------------------
+# --- Servidor ---
+
+LISTING_PATH = re.compile(r'^/catalogue/page-(\d+)\.html$')
+BOOK_PATH = re.compile(r'^/catalogue/[a-z0-9-]*_(\d+)/index\.html$')
+
+
+class _CatalogueHandler(BaseHTTPRequestHandler):
+    # Mantém as conexões abertas entre as requisições, como um servidor real. Sem
+    # TCP_NODELAY, headers e corpo em escritas separadas esperam o ACK atrasado (~40 ms)
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    books = 0
+
+    def do_GET(self):
+        body = self._render(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        body = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _render(self, path):
+        match = LISTING_PATH.match(path)
+        if match and 1 <= int(match.group(1)) <= max(1, -(-self.books // BOOKS_PER_PAGE)):
+            return listing_page(int(match.group(1)), self.books)
+        match = BOOK_PATH.match(path)
+        if match and int(match.group(1)) < self.books:
+            return book_page(int(match.group(1)))
+        return None
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CatalogueServer:
+    """
+    Servidor HTTP local com o catálogo sintético, com a mesma interface do
+    StubServer (scripts/stub_server.py).
+
+    Uso:
+        with CatalogueServer(100000) as server:
+            scrape_all_books(server.base_url)
+
+    Args:
+        books (int): Quantidade de livros do catálogo.
+        port (int): Porta local (0 escolhe uma porta livre).
+    """
+
+    def __init__(self, books, port=0):
+        handler = type('CatalogueHandler', (_CatalogueHandler,), {'books': books})
+        self.books = books
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def site_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/'
+
+    @property
+    def base_url(self):
+        """A URL base do catálogo, no formato esperado pelo scraper."""
+        return self.site_url + 'catalogue/'
+
+    def expected_books(self):
+        """Os livros que um crawl completo deve extrair, na ordem do crawl."""
+        return synthetic_books(self.books, self.site_url)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="catalogue-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class CatalogueProcess(CatalogueServer):
+    """
+    O mesmo servidor em um processo separado: nos benchmarks, o servidor não
+    disputa o GIL com o scraper medido.
+    """
+
+    def __init__(self, books, port=0):
+        self.books = books
+        self.port = port or free_port()
+        self.process = None
+
+    @property
+    def site_url(self):
+        return f'http://127.0.0.1:{self.port}/'
+
+    def start(self, timeout=10):
+        self.process = subprocess.Popen([sys.executable, __file__, '--books', str(self.books), '--port', str(self.port)],
+                                        stdout=subprocess.DEVNULL)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                urllib.request.urlopen(self.base_url + 'page-1.html', timeout=1).close()
+                return self
+            except OSError:
+                if time.monotonic() > deadline or self.process.poll() is not None:
+                    self.stop()
+                    raise RuntimeError(f"O servidor do catálogo não respondeu em {self.base_url}.")
+                time.sleep(0.05)
+
+    def stop(self):
+        self.process.terminate()
+        self.process.wait()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve um catálogo sintético no layout do books.toscrape.com.")
+    parser.add_argument('--books', type=int, default=1000, help="Quantidade de livros.")
+    parser.add_argument('--port', type=int, default=8002, help="Porta local.")
+    args = parser.parse_args()
+
+    server = CatalogueServer(args.books, args.port)
+    print(f"Servindo {args.books} livros em {server.base_url} (Ctrl+C para encerrar)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
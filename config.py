@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -6,8 +8,47 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
-    DEFAULT_ADMIN_PASSWORD: str
+    # Senha do admin: o hash argon2 pronto (preferível, evita calcular o hash no
+    # processo) ou a senha em texto, cujo hash é calculado uma vez no primeiro login
+    DEFAULT_ADMIN_PASSWORD: Optional[str] = None
+    DEFAULT_ADMIN_PASSWORD_HASH: Optional[str] = None
+
+    # Quantidade de tokens JWT já verificados mantidos em cache (0 desativa)
+    TOKEN_CACHE_SIZE: int = 1024
+
+    # Carrega os dados em background na inicialização, em vez de esperar o primeiro uso
+    PRELOAD_DATA: bool = True
+    # Intervalo, em segundos, da verificação de dados novos publicados pelo scraper (0 desativa)
+    DATA_WATCH_INTERVAL: float = 0
+    # Diretório onde um único processo publica os dados já preparados para os demais
+    # workers (uvicorn --workers N), que os mapeiam em memória em vez de montar os seus
+    SHARED_DATA_DIR: Optional[str] = None
+
+    # Onde ficam os livros consultados pelos endpoints: 'memory' (DataFrames e índices
+    # em memória, lidos do CSV) ou 'sqlite' (o banco gravado pelo scraper com --database)
+    STORAGE_BACKEND: Literal["memory", "sqlite"] = "memory"
+    DATABASE_PATH: str = "data/books.db"
+    # Conexões de leitura ociosas mantidas abertas no modo 'sqlite'
+    DATABASE_POOL_SIZE: int = 4
+
+    # Catálogo extraído pelos jobs de scraping disparados pela API
+    SCRAPER_BASE_URL: str = "https://books.toscrape.com/catalogue/"
+    SCRAPER_CONCURRENCY: int = 16
+
+    # Validade, em segundos, das respostas públicas em caches de clientes e CDNs (Cache-Control)
+    HTTP_CACHE_MAX_AGE: int = 60
+
+    # Profiler por amostragem nas requisições com o header 'X-Profile: 1' (só para desenvolvimento)
+    PROFILING_ENABLED: bool = False
+    PROFILING_INTERVAL: float = 0.001
+
     # Carrega as variáveis a partir de um arquivo .env
     model_config = SettingsConfigDict(env_file=".env")
 
+    @model_validator(mode="after")
+    def check_admin_password(self):
+        if not self.DEFAULT_ADMIN_PASSWORD and not self.DEFAULT_ADMIN_PASSWORD_HASH:
+            raise ValueError("Defina DEFAULT_ADMIN_PASSWORD_HASH ou DEFAULT_ADMIN_PASSWORD.")
+        return self
+
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,113 @@
+import json
+import os
+import time
+
+
+# Intervalo mínimo, em segundos, entre duas gravações do arquivo de checkpoint
+CHECKPOINT_INTERVAL = 5
+
+
+class CrawlCheckpoint:
+    """
+    Registra o progresso de um crawl para que ele possa ser retomado.
+
+    Cada livro extraído é gravado imediatamente em um arquivo JSON Lines
+    (append-only), junto com a sua posição no catálogo. O arquivo de checkpoint
+    guarda a fronteira do crawl: as páginas de listagem já visitadas, com os seus
+    links, e as URLs de detalhes ainda pendentes.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.state_path = os.path.join(directory, 'checkpoint.json')
+        self.stream_path = os.path.join(directory, 'books.jsonl')
+        self.pages = {}
+        self.done = set()
+        self._last_save = 0.0
+
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding='utf-8') as f:
+                self.pages = json.load(f)['pages']
+        if os.path.exists(self.stream_path):
+            for record in self._read_stream():
+                self.done.add(record['url'])
+        self._stream = open(self.stream_path, 'a', encoding='utf-8')
+        if self._stream.tell() > 0:
+            # Isola uma eventual linha incompleta da próxima gravação
+            self._stream.write('\n')
+
+    @property
+    def resumed(self):
+        """Indica se o checkpoint veio de uma execução anterior."""
+        return bool(self.pages or self.done)
+
+    @property
+    def pending(self):
+        """URLs de detalhes já descobertas e ainda não gravadas."""
+        return [link for page in self.pages.values() for link in page['links'] if link not in self.done]
+
+    def get_page(self, page_url):
+        """Retorna a listagem salva de uma página como (links, próxima URL, total de páginas) ou None."""
+        page = self.pages.get(page_url)
+        if page is None:
+            return None
+        return page['links'], page['next_url'], page['total_pages']
+
+    def add_page(self, page_url, page_number, listing):
+        """Registra uma página de listagem visitada."""
+        links, next_url, total_pages = listing
+        self.pages[page_url] = {
+            'number': page_number, 'links': links, 'next_url': next_url, 'total_pages': total_pages,
+        }
+        self.save(force=False)
+
+    def is_done(self, book_url):
+        return book_url in self.done
+
+    def add_book(self, book_url, page_number, position, book):
+        """Grava um livro no arquivo de saída assim que ele é extraído."""
+        record = {'url': book_url, 'page': page_number, 'position': position, 'book': book}
+        self._stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._stream.flush()
+        self.done.add(book_url)
+
+    def save(self, force=True):
+        """Grava o checkpoint de forma atômica, no máximo a cada CHECKPOINT_INTERVAL segundos."""
+        now = time.monotonic()
+        if not force and now - self._last_save < CHECKPOINT_INTERVAL:
+            return
+        self._last_save = now
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'pages': self.pages, 'pending': self.pending}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def load_books(self):
+        """Lê os livros gravados, na ordem em que aparecem no catálogo."""
+        self._stream.flush()
+        records = sorted(self._read_stream(), key=lambda r: (r['page'], r['position']))
+        return [record['book'] for record in records]
+
+    def close(self):
+        self._stream.close()
+
+    def clear(self):
+        """Remove os arquivos do checkpoint após um crawl concluído."""
+        self.close()
+        for path in (self.state_path, self.stream_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _read_stream(self):
+        seen = set()
+        with open(self.stream_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Linha incompleta deixada por uma interrupção durante a escrita
+                    continue
+                if record['url'] not in seen:
+                    seen.add(record['url'])
+                    yield record
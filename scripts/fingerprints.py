@@ -0,0 +1,78 @@
+import hashlib
+import json
+import os
+
+
+class FingerprintStore:
+    """
+    Armazena, para cada URL já baixada, o ETag, o Last-Modified e o hash do
+    conteúdo, junto com o resultado do parsing da página.
+
+    Permite enviar requisições condicionais e reaproveitar o resultado de
+    páginas que não mudaram desde o último crawl, sem parseá-las de novo.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.seen = set()
+        self.changed = set()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def content_hash(body):
+        """Calcula o hash do conteúdo de uma página."""
+        return hashlib.sha256(body).hexdigest()
+
+    def conditional_headers(self, url):
+        """Retorna os headers If-None-Match/If-Modified-Since para a URL, se conhecidos."""
+        entry = self.entries.get(url)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def is_unchanged(self, url, body):
+        """Verifica se o conteúdo baixado é idêntico ao da última execução."""
+        entry = self.entries.get(url)
+        return entry is not None and entry['hash'] == self.content_hash(body)
+
+    def get(self, url):
+        """Retorna o resultado do parsing salvo para a URL e a marca como visitada."""
+        self.seen.add(url)
+        return self.entries[url]['data']
+
+    def keep(self, url):
+        """Marca a URL como visitada sem baixá-la (ex.: já extraída antes de um checkpoint)."""
+        self.seen.add(url)
+
+    def put(self, url, body, headers, data):
+        """Registra a impressão digital e o resultado do parsing de uma página nova ou alterada."""
+        self.seen.add(url)
+        self.changed.add(url)
+        self.entries[url] = {
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'hash': self.content_hash(body),
+            'data': data,
+        }
+
+    def prune(self):
+        """Remove as URLs que não foram visitadas nesta execução. Retorna quantas foram removidas."""
+        removed = [url for url in self.entries if url not in self.seen]
+        for url in removed:
+            del self.entries[url]
+        return len(removed)
+
+    def save(self):
+        """Grava o arquivo de forma atômica."""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,232 @@
+import os
+import sys
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+except ImportError:  # O backend lxml é opcional
+    lxml = None
+
+
+RATINGS_MAP = {'One': 1, 'Two': 2, 'Three': 3, 'Four': 4, 'Five': 5}
+
+# Exceções que indicam uma página sem a estrutura esperada
+PARSE_ERRORS = (AttributeError, IndexError, KeyError, TypeError)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def _clean_availability(availability):
+    """Limpa o texto da disponibilidade para obter apenas o número."""
+    if availability:
+        availability = availability.split('(')[1].replace(' available)', '').strip()
+    return availability
+
+
+class BeautifulSoupParser:
+    """
+    Backend de referência, com BeautifulSoup e o 'html.parser' puro Python.
+    """
+    name = 'bs4'
+
+    def parse_book(self, html, book_url):
+        """
+        Extrai os detalhes de um livro a partir do HTML da sua página.
+
+        Args:
+            html (bytes | str): O conteúdo da página do livro.
+            book_url (str): A URL da página, usada para resolver a URL da imagem.
+
+        Returns:
+            dict: Um dicionário contendo os detalhes do livro.
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+
+        # Extração das informações
+        title = soup.find('h1').text
+        # A tabela de informações do produto contém preço, disponibilidade e UPC
+        product_info = {th.text: td.text for th, td in zip(soup.select('table th'), soup.select('table td'))}
+
+        # O rating é dado por uma classe CSS, ex: 'star-rating Three'
+        rating_class = soup.select_one('.star-rating')['class'][1]
+
+        # A categoria está no breadcrumb
+        category = soup.select_one('.breadcrumb li:nth-of-type(3) a').text
+
+        # A URL da imagem precisa ser unida com a URL base
+        image_relative_url = soup.select_one('#product_gallery img')['src']
+
+        return {
+            'title': title,
+            'price': product_info.get('Price (incl. tax)'),
+            'rating': RATINGS_MAP.get(rating_class, 0),
+            'availability': _clean_availability(product_info.get('Availability')),
+            'category': category,
+            'image_url': urljoin(book_url, image_relative_url),
+        }
+
+    def parse_listing(self, html, base_url):
+        """
+        Extrai os links dos livros e a paginação de uma página de listagem.
+
+        Returns:
+            tuple: (links dos livros, URL da próxima página ou None,
+            total de páginas do catálogo ou None se não houver paginador).
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+
+        # Encontra todos os links de livros na página atual
+        book_links = [base_url + a['href'].replace('../', '') for a in soup.select('article.product_pod h3 a')]
+
+        # Verifica se há um botão "next" para a próxima página
+        next_button = soup.select_one('.next a')
+        next_url = base_url + next_button['href'] if next_button else None
+
+        current = soup.select_one('.pager .current')
+        return book_links, next_url, _total_pages(current.text if current else None)
+
+
+# Seletores XPath equivalentes aos seletores CSS do backend BeautifulSoup
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+XPATH_TITLE = '//h1'
+XPATH_TABLE_HEADERS = '//table//th'
+XPATH_TABLE_CELLS = '//table//td'
+XPATH_RATING = f'//*[{_has_class("star-rating")}]/@class'
+XPATH_CATEGORY = f'//*[{_has_class("breadcrumb")}]//li[3]//a'
+XPATH_IMAGE = "//*[@id='product_gallery']//img/@src"
+XPATH_BOOK_LINKS = f'//article[{_has_class("product_pod")}]//h3//a/@href'
+XPATH_NEXT = f'//*[{_has_class("next")}]//a/@href'
+XPATH_CURRENT_PAGE = f'//*[{_has_class("pager")}]//*[{_has_class("current")}]'
+
+
+class LxmlParser:
+    """
+    Backend rápido, com o parser em C do lxml e consultas XPath que extraem
+    apenas os campos usados (título, tabela do produto, rating, breadcrumb e imagem).
+    """
+    name = 'lxml'
+
+    def __init__(self):
+        if lxml is None:
+            raise ImportError("O backend 'lxml' requer o pacote lxml (pip install lxml).")
+        # As páginas do catálogo são UTF-8; decodificar direto evita a detecção de encoding
+        self._parser = lxml.html.HTMLParser(encoding='utf-8')
+
+    def _parse(self, html):
+        if isinstance(html, str):
+            return lxml.html.document_fromstring(html)
+        return lxml.html.document_fromstring(html, parser=self._parser)
+
+    def parse_book(self, html, book_url):
+        """Mesmo contrato de BeautifulSoupParser.parse_book."""
+        tree = self._parse(html)
+
+        title = tree.xpath(XPATH_TITLE)[0].text_content()
+        headers = [th.text_content() for th in tree.xpath(XPATH_TABLE_HEADERS)]
+        cells = [td.text_content() for td in tree.xpath(XPATH_TABLE_CELLS)]
+        product_info = dict(zip(headers, cells))
+        rating_class = tree.xpath(XPATH_RATING)[0].split()[1]
+        category = tree.xpath(XPATH_CATEGORY)[0].text_content()
+        image_relative_url = tree.xpath(XPATH_IMAGE)[0]
+
+        return {
+            'title': title,
+            'price': product_info.get('Price (incl. tax)'),
+            'rating': RATINGS_MAP.get(rating_class, 0),
+            'availability': _clean_availability(product_info.get('Availability')),
+            'category': category,
+            'image_url': urljoin(book_url, image_relative_url),
+        }
+
+    def parse_listing(self, html, base_url):
+        """Mesmo contrato de BeautifulSoupParser.parse_listing."""
+        tree = self._parse(html)
+
+        book_links = [base_url + href.replace('../', '') for href in tree.xpath(XPATH_BOOK_LINKS)]
+        next_hrefs = tree.xpath(XPATH_NEXT)
+        next_url = base_url + next_hrefs[0] if next_hrefs else None
+        current = tree.xpath(XPATH_CURRENT_PAGE)
+        return book_links, next_url, _total_pages(current[0].text_content() if current else None)
+
+
+def _total_pages(pager_text):
+    """O paginador informa o total de páginas, ex: 'Page 1 of 50'."""
+    if pager_text:
+        parts = pager_text.split()
+        if parts and parts[-1].isdigit():
+            return int(parts[-1])
+    return None
+
+
+PARSERS = {
+    BeautifulSoupParser.name: BeautifulSoupParser,
+    LxmlParser.name: LxmlParser,
+}
+
+
+def available_parsers():
+    """Nomes dos backends que podem ser usados neste ambiente."""
+    return [name for name in PARSERS if name != LxmlParser.name or lxml is not None]
+
+
+def get_parser(name='auto'):
+    """
+    Retorna uma instância do backend de parsing.
+
+    Args:
+        name (str): 'bs4', 'lxml' ou 'auto' (lxml quando instalado, senão bs4).
+    """
+    if name == 'auto':
+        name = LxmlParser.name if lxml is not None else BeautifulSoupParser.name
+    if name not in PARSERS:
+        raise ValueError(f"Backend de parsing desconhecido: {name}. Opções: {', '.join(PARSERS)}")
+    return PARSERS[name]()
+
+
+def verify_parsers(fixtures_dir=FIXTURES_DIR, base_url='https://books.toscrape.com/catalogue/'):
+    """
+    Compara a saída de todos os backends disponíveis com a do backend de
+    referência (bs4) para as páginas salvas em fixtures_dir.
+
+    Páginas cujo nome começa com 'listing' são tratadas como listagens; as
+    demais, como páginas de livro.
+
+    Returns:
+        list: As divergências encontradas, como tuplas (arquivo, backend, esperado, obtido).
+    """
+    reference = BeautifulSoupParser()
+    others = [get_parser(name) for name in available_parsers() if name != reference.name]
+    mismatches = []
+    for filename in sorted(os.listdir(fixtures_dir)):
+        if not filename.endswith('.html'):
+            continue
+        with open(os.path.join(fixtures_dir, filename), 'rb') as f:
+            html = f.read()
+        if filename.startswith('listing'):
+            parse = lambda parser: parser.parse_listing(html, base_url)
+        else:
+            book_url = base_url + filename.replace('.html', '') + '/index.html'
+            parse = lambda parser: parser.parse_book(html, book_url)
+        expected = parse(reference)
+        for parser in others:
+            result = parse(parser)
+            if result != expected:
+                mismatches.append((filename, parser.name, expected, result))
+    return mismatches
+
+
+if __name__ == '__main__':
+    # Verifica se todos os backends produzem a mesma saída para as páginas salvas
+    if lxml is None:
+        print("AVISO: lxml não está instalado; apenas o backend bs4 está disponível.")
+    mismatches = verify_parsers()
+    for filename, backend, expected, result in mismatches:
+        print(f"{filename} [{backend}]\n  esperado: {expected}\n  obtido:   {result}")
+    if mismatches:
+        sys.exit(1)
+    print(f"Backends {', '.join(available_parsers())} produzem a mesma saída para as fixtures.")
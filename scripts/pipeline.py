@@ -0,0 +1,99 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+from scripts.parsers import get_parser
+
+
+# Tamanho padrão da fila entre o estágio de download e o de parsing, por processo
+QUEUE_SIZE_PER_WORKER = 8
+
+BOOK_PAGE = 'book'
+LISTING_PAGE = 'listing'
+
+# Backend de parsing de cada processo do pool, criado uma única vez por processo
+_worker_parser = None
+
+
+def _init_worker(parser_name):
+    global _worker_parser
+    _worker_parser = get_parser(parser_name)
+
+
+def _parse_page(kind, html, url):
+    """Executado nos processos do pool: parseia o HTML recebido em bytes."""
+    if kind == BOOK_PAGE:
+        return _worker_parser.parse_book(html, url)
+    return _worker_parser.parse_listing(html, url)
+
+
+class ParseStage:
+    """
+    Estágio de parsing do crawl, desacoplado do download.
+
+    O HTML baixado entra em uma fila limitada e é consumido por um pool de
+    processos, de modo que o parsing (CPU) usa todos os núcleos enquanto o
+    event loop continua baixando páginas. Os bytes brutos da resposta são
+    enviados aos processos sem decodificação intermediária. Quando a fila
+    enche, o download espera, o que limita a memória usada.
+
+    Com workers=0, o parsing acontece no próprio event loop, sem fila.
+
+    Args:
+        parser: Backend de parsing (ver scripts/parsers.py).
+        workers (int): Número de processos do pool.
+        queue_size (int, opcional): Capacidade da fila entre os estágios.
+    """
+
+    def __init__(self, parser, workers=0, queue_size=None):
+        self.parser = parser
+        self.workers = workers
+        self.queue_size = queue_size or max(1, workers) * QUEUE_SIZE_PER_WORKER
+        self.queue = None
+        self.pool = None
+        self._consumers = []
+
+    async def start(self):
+        if not self.workers:
+            return
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.parser.name,))
+        # Dois consumidores por processo mantêm o pool ocupado enquanto um resultado volta
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.workers * 2)]
+
+    async def close(self):
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+        if self.pool:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.pool = None
+
+    async def parse(self, kind, html, url):
+        """
+        Parseia uma página de livro (BOOK_PAGE, url da página) ou de listagem
+        (LISTING_PAGE, url base do catálogo). Propaga os erros de parsing.
+        """
+        if not self.workers:
+            if kind == BOOK_PAGE:
+                return self.parser.parse_book(html, url)
+            return self.parser.parse_listing(html, url)
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((kind, html, url, future))
+        return await future
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            kind, html, url, future = await self.queue.get()
+            try:
+                result = await loop.run_in_executor(self.pool, _parse_page, kind, html, url)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self.queue.task_done()
@@ -1,125 +1,536 @@
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 import os
-from urllib.parse import urljoin
+import sys
+import time
+import asyncio
+import argparse
+import atexit
 
-def get_book_details(book_url):
+import aiohttp
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Permite executar o script diretamente ('python scripts/scraper.py') a partir da raiz do projeto
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.dataset import write_columnar
+from api.storage import BookDatabase
+from api.metrics import REGISTRY, Counter, Histogram
+from scripts.checkpoint import CrawlCheckpoint
+from scripts.fingerprints import FingerprintStore
+from scripts.parsers import PARSE_ERRORS, get_parser
+from scripts.pipeline import BOOK_PAGE, LISTING_PAGE, ParseStage
+from scripts.throttle import RETRYABLE_STATUSES, RetryPolicy, Throttle
+
+
+BASE_URL = 'https://books.toscrape.com/catalogue/'
+REQUEST_TIMEOUT = 10
+DEFAULT_CONCURRENCY = 16
+DEFAULT_MAX_RETRIES = 3
+
+
+# ------------------------------------------------------------------------------
+# --- Métricas (ver api/metrics.py) ---
+
+FETCH_SECONDS = Histogram('scraper_fetch_seconds', "Latência de cada requisição do scraper, por status HTTP.", ('status',))
+PARSE_SECONDS = Histogram('scraper_parse_seconds', "Tempo de parsing de cada página, por tipo de página.", ('page',))
+PAGES_FETCHED = Counter('scraper_pages_total', "Páginas baixadas com sucesso.")
+BYTES_FETCHED = Counter('scraper_bytes_total', "Bytes de HTML baixados.")
+BOOKS_PARSED = Counter('scraper_books_total', "Livros extraídos.")
+RETRIES = Counter('scraper_retries_total', "Novas tentativas após erros temporários.")
+ERRORS = Counter('scraper_errors_total', "Páginas perdidas, por etapa (fetch ou parse).", ('stage',))
+
+
+# ------------------------------------------------------------------------------
+# --- Crawl sequencial ---
+
+def get_book_details(book_url, session=None, parser=None):
     """
     Extrai os detalhes de um único livro a partir da sua URL.
 
     Args:
         book_url (str): A URL da página do livro.
+        session (requests.Session, opcional): Sessão HTTP reutilizada entre as requisições.
+        parser (opcional): Backend de parsing (ver scripts/parsers.py).
 
     Returns:
         dict: Um dicionário contendo os detalhes do livro, ou None se ocorrer um erro.
     """
+    http = session or requests
+    parser = parser or get_parser()
     try:
-        response = requests.get(book_url)
+        response = _get(http, book_url)
         response.raise_for_status()  # Lança uma exceção para códigos de status HTTP ruins
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Extração das informações
-        title = soup.find('h1').text
-        # A tabela de informações do produto contém preço, disponibilidade e UPC
-        product_info = {th.text: td.text for th, td in zip(soup.select('table th'), soup.select('table td'))}
-        price = product_info.get('Price (incl. tax)')
-        availability = product_info.get('Availability')
-        # Limpa o texto da disponibilidade para obter apenas o número
-        if availability:
-            availability = availability.split('(')[1].replace(' available)', '').strip()
-
-        # O rating é dado por uma classe CSS, ex: 'star-rating Three'
-        rating_class = soup.select_one('.star-rating')['class'][1]
-        ratings_map = {'One': 1, 'Two': 2, 'Three': 3, 'Four': 4, 'Five': 5}
-        rating = ratings_map.get(rating_class, 0)
-        
-        # A categoria está no breadcrumb
-        category = soup.select_one('.breadcrumb li:nth-of-type(3) a').text
-        
-        # A URL da imagem precisa ser unida com a URL base
-        image_relative_url = soup.select_one('#product_gallery img')['src']
-        
-        # Usando urljoin para construir a URL absoluta
-        image_url = urljoin(book_url, image_relative_url)
-
-        return {
-            'title': title,
-            'price': price,
-            'rating': rating,
-            'availability': availability,
-            'category': category,
-            'image_url': image_url,
-        }
+        with PARSE_SECONDS.time(page=BOOK_PAGE):
+            book = parser.parse_book(response.content, book_url)
+        BOOKS_PARSED.inc()
+        return book
 
     except requests.exceptions.RequestException as e:
+        ERRORS.inc(stage='fetch')
         print(f"Erro ao acessar {book_url}: {e}")
         return None
-    except (AttributeError, IndexError) as e:
+    except PARSE_ERRORS as e:
+        ERRORS.inc(stage='parse')
         print(f"Erro ao parsear a página {book_url}: {e}")
         return None
 
 
-def scrape_all_books():
+def _get(http, url):
+    """GET com as métricas de latência e de bytes baixados."""
+    started = time.perf_counter()
+    try:
+        response = http.get(url, timeout=REQUEST_TIMEOUT)
+    except requests.exceptions.RequestException:
+        FETCH_SECONDS.observe(time.perf_counter() - started, status='error')
+        raise
+    FETCH_SECONDS.observe(time.perf_counter() - started, status=response.status_code)
+    if response.status_code == 200:
+        PAGES_FETCHED.inc()
+        BYTES_FETCHED.inc(len(response.content))
+    return response
+
+
+def scrape_all_books(base_url=BASE_URL, parser=None):
     """
     Realiza o scraping de todos os livros do site books.toscrape.com,
     navegando por todas as páginas.
-    
+
+    Args:
+        base_url (str): A URL base do catálogo.
+        parser (opcional): Backend de parsing (ver scripts/parsers.py).
+
     Returns:
         list: Uma lista de dicionários, onde cada dicionário representa um livro.
     """
-    base_url = 'https://books.toscrape.com/catalogue/'
+    parser = parser or get_parser()
     current_page_url = base_url + 'page-1.html'
     all_books_data = []
     page_number = 1
 
-    while current_page_url:
-        print(f"Scraping página {page_number}: {current_page_url}")
-        response = requests.get(current_page_url, timeout=10)
-
-        if response.status_code != 200:
-            print(f"Falha ao acessar a página {page_number}. Status: {response.status_code}")
-            break
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Encontra todos os links de livros na página atual
-        book_links = [base_url + a['href'].replace('../', '') for a in soup.select('article.product_pod h3 a')]
-        
-        for link in book_links:
-            book_details = get_book_details(link)
-            if book_details:
-                all_books_data.append(book_details)
-        
-        # Verifica se há um botão "next" para a próxima página
-        next_button = soup.select_one('.next a')
-        if next_button:
-            current_page_url = base_url + next_button['href']
+    # Uma única sessão mantém as conexões abertas entre as requisições
+    with requests.Session() as session:
+        # Novas tentativas com backoff exponencial para erros temporários (429/5xx)
+        retries = Retry(total=DEFAULT_MAX_RETRIES, backoff_factor=0.5, status_forcelist=RETRYABLE_STATUSES,
+                        allowed_methods=['GET'], raise_on_status=False)
+        session.mount('http://', HTTPAdapter(max_retries=retries))
+        session.mount('https://', HTTPAdapter(max_retries=retries))
+        while current_page_url:
+            print(f"Scraping página {page_number}: {current_page_url}")
+            response = _get(session, current_page_url)
+
+            if response.status_code != 200:
+                ERRORS.inc(stage='fetch')
+                print(f"Falha ao acessar a página {page_number}. Status: {response.status_code}")
+                break
+
+            with PARSE_SECONDS.time(page=LISTING_PAGE):
+                book_links, current_page_url, _ = parser.parse_listing(response.content, base_url)
+
+            for link in book_links:
+                book_details = get_book_details(link, session=session, parser=parser)
+                if book_details:
+                    all_books_data.append(book_details)
+
             page_number += 1
-        else:
-            current_page_url = None # Fim da paginação
 
     return all_books_data
 
 
+# ------------------------------------------------------------------------------
+# --- Crawl concorrente (asyncio) ---
+
+# Indica que a página não mudou desde o último crawl (modo incremental)
+UNCHANGED = object()
+
+
+class CrawlStats:
+    """Contadores de progresso de um crawl, lidos enquanto ele está em andamento."""
+
+    def __init__(self):
+        self.started_at = None
+        self.finished_at = None
+        self.pages_fetched = 0
+        self.bytes_fetched = 0
+        self.books_parsed = 0
+        self.errors = 0
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def books_per_second(self):
+        elapsed = self.elapsed
+        return self.books_parsed / elapsed if elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            'pages_fetched': self.pages_fetched,
+            'bytes_fetched': self.bytes_fetched,
+            'books_parsed': self.books_parsed,
+            'errors': self.errors,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'books_per_second': round(self.books_per_second, 2),
+        }
+
+
+class AsyncCrawler:
+    """
+    Crawl concorrente do catálogo com um único cliente HTTP e pool de conexões.
+
+    Args:
+        base_url (str): A URL base do catálogo.
+        concurrency (int): Número máximo de requisições simultâneas por host. O
+            limite efetivo é ajustado pela latência e pela taxa de erros observadas.
+        fingerprints (FingerprintStore, opcional): Ativa o modo incremental, com
+            requisições condicionais e reaproveitamento das páginas inalteradas.
+        checkpoint (CrawlCheckpoint, opcional): Grava cada livro assim que é
+            extraído e permite retomar um crawl interrompido.
+        parser (opcional): Backend de parsing (ver scripts/parsers.py).
+        parse_workers (int): Processos dedicados ao parsing. Com 0, o parsing
+            acontece no próprio event loop.
+        parse_queue_size (int, opcional): Capacidade da fila entre o download e o parsing.
+        rate (float, opcional): Máximo de requisições por segundo por host.
+        retry_policy (RetryPolicy, opcional): Política de novas tentativas para erros temporários.
+    """
+
+    def __init__(self, base_url=BASE_URL, concurrency=DEFAULT_CONCURRENCY, fingerprints=None, checkpoint=None,
+                 parser=None, parse_workers=0, parse_queue_size=None, rate=None, retry_policy=None):
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.rate = rate
+        self.retry_policy = retry_policy or RetryPolicy(DEFAULT_MAX_RETRIES)
+        self.fingerprints = fingerprints
+        self.checkpoint = checkpoint
+        self.parse_stage = ParseStage(parser or get_parser(), workers=parse_workers, queue_size=parse_queue_size)
+        self.stats = CrawlStats()
+        self.session = None
+        self.throttle = None
+
+    async def run(self):
+        """
+        Executa o crawl completo.
+
+        Returns:
+            list: A mesma lista de dicionários retornada por scrape_all_books(),
+            na mesma ordem.
+        """
+        self.stats.started_at = time.monotonic()
+        await self.parse_stage.start()
+        try:
+            pages = await self._crawl()
+        finally:
+            await self.parse_stage.close()
+            self.stats.finished_at = time.monotonic()
+
+        if self.checkpoint:
+            self.checkpoint.save()
+            return self.checkpoint.load_books()
+        return [book for page in pages for book in page]
+
+    async def _crawl(self):
+        """Percorre as listagens e os livros. Retorna os livros agrupados por página."""
+        self.throttle = Throttle(self.concurrency, rate=self.rate)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as self.session:
+            listing = await self._get_listing_page(self.base_url + 'page-1.html', 1)
+            if listing is None:
+                return []
+            book_links, next_url, total_pages = listing
+
+            tasks = [asyncio.create_task(self._scrape_books(book_links, 1))]
+            if total_pages:
+                # Com o total de páginas conhecido, todas as listagens são baixadas de uma vez
+                for page_number in range(2, total_pages + 1):
+                    page_url = self.base_url + f'page-{page_number}.html'
+                    tasks.append(asyncio.create_task(self._scrape_listing_page(page_url, page_number)))
+            else:
+                # Sem paginador, segue os links "next"; os detalhes continuam em paralelo
+                page_number = 1
+                while next_url:
+                    page_number += 1
+                    listing = await self._get_listing_page(next_url, page_number)
+                    if listing is None:
+                        break
+                    book_links, next_url, _ = listing
+                    tasks.append(asyncio.create_task(self._scrape_books(book_links, page_number)))
+
+            return await asyncio.gather(*tasks)
+
+    async def _fetch(self, url):
+        """
+        Baixa uma URL respeitando o limite de taxa e de concorrência do host,
+        com novas tentativas para erros temporários.
+
+        No modo incremental, envia uma requisição condicional e retorna
+        UNCHANGED se a página não mudou. Caso contrário, retorna uma tupla
+        (corpo em bytes, headers) ou None em caso de erro.
+        """
+        headers = self.fingerprints.conditional_headers(url) if self.fingerprints else None
+        host_throttle = self.throttle.for_url(url)
+        attempt = 0
+        while True:
+            status, retry_after, error = None, None, None
+            async with host_throttle:
+                started = time.monotonic()
+                try:
+                    async with self.session.get(url, headers=headers) as response:
+                        status = response.status
+                        retry_after = response.headers.get('Retry-After')
+                        if status == 200:
+                            body = await response.read()
+                            response_headers = response.headers
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = e
+                elapsed = time.monotonic() - started
+                host_throttle.record(elapsed, status)
+                FETCH_SECONDS.observe(elapsed, status=status if status is not None else 'error')
+
+            if status in (200, 304):
+                break
+            if self.retry_policy.should_retry(status, attempt):
+                RETRIES.inc()
+                await asyncio.sleep(self.retry_policy.delay(attempt, retry_after))
+                attempt += 1
+                continue
+            self.stats.errors += 1
+            ERRORS.inc(stage='fetch')
+            if error is not None:
+                print(f"Erro ao acessar {url}: {error}")
+            else:
+                print(f"Falha ao acessar {url}. Status: {status}")
+            return None
+
+        self.stats.pages_fetched += 1
+        PAGES_FETCHED.inc()
+        if status == 304:
+            return UNCHANGED
+        self.stats.bytes_fetched += len(body)
+        BYTES_FETCHED.inc(len(body))
+        # Servidores sem suporte a ETag/Last-Modified ainda são comparados pelo hash do conteúdo
+        if self.fingerprints and self.fingerprints.is_unchanged(url, body):
+            return UNCHANGED
+        return body, response_headers
+
+    async def _get_book_details(self, book_url):
+        """Versão assíncrona de get_book_details."""
+        result = await self._fetch(book_url)
+        if result is UNCHANGED:
+            return self.fingerprints.get(book_url)
+        if result is None:
+            return None
+        html, headers = result
+        try:
+            with PARSE_SECONDS.time(page=BOOK_PAGE):
+                book = await self.parse_stage.parse(BOOK_PAGE, html, book_url)
+        except PARSE_ERRORS as e:
+            self.stats.errors += 1
+            ERRORS.inc(stage='parse')
+            print(f"Erro ao parsear a página {book_url}: {e}")
+            return None
+        if self.fingerprints:
+            self.fingerprints.put(book_url, html, headers, book)
+        return book
+
+    async def _get_listing_page(self, page_url, page_number):
+        """Baixa e parseia uma página de listagem. Retorna o mesmo que parser.parse_listing ou None."""
+        if self.checkpoint:
+            listing = self.checkpoint.get_page(page_url)
+            if listing is not None:
+                # Sem isso, prune() apagaria a impressão digital da página no fim do crawl retomado
+                if self.fingerprints:
+                    self.fingerprints.keep(page_url)
+                return listing
+
+        print(f"Scraping página {page_number}: {page_url}")
+        result = await self._fetch(page_url)
+        if result is UNCHANGED:
+            listing = tuple(self.fingerprints.get(page_url))
+        elif result is None:
+            return None
+        else:
+            html, headers = result
+            try:
+                with PARSE_SECONDS.time(page=LISTING_PAGE):
+                    listing = await self.parse_stage.parse(LISTING_PAGE, html, self.base_url)
+            except PARSE_ERRORS as e:
+                self.stats.errors += 1
+                ERRORS.inc(stage='parse')
+                print(f"Erro ao parsear a página {page_url}: {e}")
+                return None
+            if self.fingerprints:
+                self.fingerprints.put(page_url, html, headers, list(listing))
+
+        if self.checkpoint:
+            self.checkpoint.add_page(page_url, page_number, listing)
+        return listing
+
+    async def _scrape_book(self, book_url, page_number, position):
+        if self.checkpoint and self.checkpoint.is_done(book_url):
+            if self.fingerprints:
+                self.fingerprints.keep(book_url)
+            return None
+        book = await self._get_book_details(book_url)
+        if book:
+            self.stats.books_parsed += 1
+            BOOKS_PARSED.inc()
+        if book and self.checkpoint:
+            # Com checkpoint, o livro vai direto para o disco em vez de ficar em memória
+            self.checkpoint.add_book(book_url, page_number, position, book)
+            return None
+        return book
+
+    async def _scrape_books(self, book_links, page_number):
+        """Baixa os livros de uma página de listagem em paralelo, preservando a ordem."""
+        results = await asyncio.gather(
+            *(self._scrape_book(link, page_number, position) for position, link in enumerate(book_links))
+        )
+        return [book for book in results if book]
+
+    async def _scrape_listing_page(self, page_url, page_number):
+        """Baixa uma página de listagem e, em seguida, todos os seus livros."""
+        listing = await self._get_listing_page(page_url, page_number)
+        if listing is None:
+            return []
+        book_links, _, _ = listing
+        return await self._scrape_books(book_links, page_number)
+
+
+async def scrape_all_books_async(base_url=BASE_URL, concurrency=DEFAULT_CONCURRENCY, fingerprints=None,
+                                 checkpoint=None, parser=None, parse_workers=0, rate=None,
+                                 max_retries=DEFAULT_MAX_RETRIES):
+    """
+    Realiza o scraping de todos os livros usando um único cliente HTTP com pool
+    de conexões, baixando páginas de listagem e de detalhes concorrentemente.
+
+    Returns:
+        list: A mesma lista de dicionários retornada por scrape_all_books(),
+        na mesma ordem.
+    """
+    crawler = AsyncCrawler(base_url, concurrency=concurrency, fingerprints=fingerprints, checkpoint=checkpoint,
+                           parser=parser, parse_workers=parse_workers, rate=rate,
+                           retry_policy=RetryPolicy(max_retries))
+    return await crawler.run()
+
+
+# ------------------------------------------------------------------------------
+# --- Execução via linha de comando ---
+
+def save_books(books_data, output_path):
+    """Salva a lista de livros em um arquivo CSV, substituindo o anterior de forma atômica."""
+    # Converte a lista de dicionários para um DataFrame do Pandas
+    df = pd.DataFrame(books_data)
+
+    # Garante que o diretório de saída exista
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+
+    # Grava em um arquivo temporário para que leitores nunca vejam um CSV pela metade
+    tmp_path = output_path + '.tmp'
+    df.to_csv(tmp_path, index=False, encoding='utf-8')
+    os.replace(tmp_path, output_path)
+    return df
+
+
+def write_metrics(path):
+    """Grava as métricas do processo no formato de texto do Prometheus (ex.: textfile collector do node_exporter)."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(REGISTRY.render())
+    os.replace(tmp_path, path)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Web scraping do site books.toscrape.com.")
+    parser.add_argument('--base-url', default=BASE_URL, help="URL base do catálogo.")
+    parser.add_argument('--output', default=os.path.join('data', 'books.csv'), help="Arquivo CSV de saída.")
+    parser.add_argument('--columnar-dir', default=os.path.join('data', 'books_columnar'),
+                        help="Diretório do formato colunar binário carregado pela API.")
+    parser.add_argument('--database', default=None,
+                        help="Grava os livros (upsert) neste banco SQLite, usado pela API com STORAGE_BACKEND=sqlite, "
+                             "em vez de regravar o CSV e o formato colunar.")
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help="Usa o crawl concorrente com asyncio.")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help="Número máximo de requisições simultâneas no modo --async.")
+    parser.add_argument('--rate', type=float, default=None,
+                        help="Máximo de requisições por segundo por host no modo --async.")
+    parser.add_argument('--max-retries', type=int, default=DEFAULT_MAX_RETRIES,
+                        help="Novas tentativas para erros de conexão e respostas 429/5xx.")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Usa requisições condicionais e só reprocessa as páginas alteradas (implica --async).")
+    parser.add_argument('--state', default=os.path.join('data', 'fingerprints.json'),
+                        help="Arquivo com as impressões digitais das páginas no modo --incremental.")
+    parser.add_argument('--parser', default='auto', choices=['auto', 'bs4', 'lxml'],
+                        help="Backend de parsing do HTML ('auto' usa lxml quando instalado).")
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help="Processos dedicados ao parsing do HTML no modo --async (0 = no próprio event loop).")
+    parser.add_argument('--checkpoint-dir', default=None,
+                        help="Grava cada livro assim que é extraído e retoma um crawl interrompido "
+                             "a partir deste diretório (implica --async).")
+    parser.add_argument('--metrics-file', default=None,
+                        help="Grava as métricas do crawl (formato de texto do Prometheus) neste arquivo ao terminar.")
+    return parser.parse_args()
+
+
 if __name__ == '__main__':
+    args = parse_args()
+    if args.metrics_file:
+        # Também nas saídas antecipadas (sys.exit)
+        atexit.register(write_metrics, args.metrics_file)
     print("Iniciando o processo de web scraping...")
-    books_data = scrape_all_books()
-    
+    fingerprints = FingerprintStore(args.state) if args.incremental else None
+    checkpoint = CrawlCheckpoint(args.checkpoint_dir) if args.checkpoint_dir else None
+    html_parser = get_parser(args.parser)
+    if checkpoint and checkpoint.resumed:
+        print(f"Retomando crawl: {len(checkpoint.done)} livros já extraídos, "
+              f"{len(checkpoint.pending)} URLs pendentes.")
+    if args.use_async or fingerprints or checkpoint:
+        try:
+            books_data = asyncio.run(scrape_all_books_async(
+                args.base_url, concurrency=args.concurrency, fingerprints=fingerprints, checkpoint=checkpoint,
+                parser=html_parser, parse_workers=args.parse_workers, rate=args.rate,
+                max_retries=args.max_retries,
+            ))
+        except KeyboardInterrupt:
+            if not checkpoint:
+                raise
+            checkpoint.save()
+            checkpoint.close()
+            print(f"Crawl interrompido. Checkpoint salvo em {args.checkpoint_dir}.")
+            sys.exit(1)
+    else:
+        books_data = scrape_all_books(args.base_url, parser=html_parser)
+
     if books_data:
         print(f"Scraping finalizado. Total de {len(books_data)} livros encontrados.")
-        
-        # Converte a lista de dicionários para um DataFrame do Pandas
-        df = pd.DataFrame(books_data)
-        
-        # Garante que o diretório data exista
-        output_dir = 'data'
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Salva os dados em um arquivo CSV
-        output_path = os.path.join(output_dir, 'books.csv')
-        df.to_csv(output_path, index=False, encoding='utf-8')
-        
-        print(f"Dados salvos com sucesso em: {output_path}")
+        if fingerprints:
+            removed = fingerprints.prune()
+            print(f"Páginas alteradas: {len(fingerprints.changed)}. Páginas removidas: {removed}.")
+            fingerprints.save()
+            output = args.database or args.output
+            # Num crawl retomado, as alterações vistas antes da interrupção não estão em 'changed'
+            resumed = checkpoint is not None and checkpoint.resumed
+            if not fingerprints.changed and not removed and not resumed and os.path.exists(output):
+                print(f"Nenhuma alteração encontrada. {output} mantido.")
+                sys.exit(0)
+        if args.database:
+            # Só as linhas novas ou alteradas são gravadas; o ID de cada livro é mantido
+            changed = BookDatabase(args.database).upsert_books(books_data)
+            print(f"{changed} livros novos ou alterados gravados em: {args.database}")
+        else:
+            df = save_books(books_data, args.output)
+            print(f"Dados salvos com sucesso em: {args.output}")
+            version = write_columnar(df, args.columnar_dir, source_path=args.output)
+            print(f"Formato colunar (versão {version}) salvo em: {args.columnar_dir}")
+        if checkpoint:
+            checkpoint.clear()
     else:
-        print("Nenhum livro foi extraído. Verifique o script ou a conexão com a internet.")
\ No newline at end of file
+        print("Nenhum livro foi extraído. Verifique o script ou a conexão com a internet.")
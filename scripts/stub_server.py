@@ -0,0 +1,71 @@
+import argparse
+import functools
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Um catálogo mínimo, com o mesmo layout do books.toscrape.com, salvo em disco
+SITE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'site')
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer:
+    """
+    Servidor HTTP local que serve páginas salvas no lugar do books.toscrape.com,
+    para rodar o scraper (e os jobs de scraping da API) sem acesso à internet.
+
+    Uso:
+        with StubServer() as server:
+            scrape_all_books(server.base_url)
+
+    Args:
+        directory (str): Diretório servido; deve conter 'catalogue/page-1.html'.
+        port (int): Porta local (0 escolhe uma porta livre).
+    """
+
+    def __init__(self, directory=SITE_DIR, port=0):
+        handler = functools.partial(_QuietHandler, directory=directory)
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), handler)
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """A URL base do catálogo, no formato esperado pelo scraper."""
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/catalogue/'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="stub-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve páginas salvas no layout do books.toscrape.com.")
+    parser.add_argument('--directory', default=SITE_DIR, help="Diretório com as páginas salvas.")
+    parser.add_argument('--port', type=int, default=8001, help="Porta local.")
+    args = parser.parse_args()
+
+    server = StubServer(args.directory, args.port)
+    print(f"Servindo {args.directory} em {server.base_url} (Ctrl+C para encerrar)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
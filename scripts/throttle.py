@@ -0,0 +1,153 @@
+import asyncio
+import random
+import time
+from urllib.parse import urlsplit
+
+
+# Status HTTP que indicam sobrecarga ou falha temporária do servidor
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """
+    Limita a taxa de requisições: cada requisição consome um token e os tokens
+    são repostos a 'rate' por segundo, acumulando no máximo 'burst'.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AdaptiveConcurrency:
+    """
+    Limite de requisições simultâneas ajustado pelo comportamento do servidor (AIMD).
+
+    O limite cresce de 1 a cada janela de 'limit' respostas bem-sucedidas, cai
+    pela metade em erros, timeouts e respostas 429/5xx e diminui de 1 quando a
+    latência média passa de 'latency_tolerance' vezes a melhor latência observada.
+    """
+
+    def __init__(self, maximum, initial=None, minimum=1, latency_tolerance=2.0, cooldown=1.0):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.limit = initial or max(minimum, maximum // 4)
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.latency = None
+        self.best_latency = None
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def release(self):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def record(self, latency, ok):
+        """Registra o resultado de uma requisição e ajusta o limite."""
+        now = time.monotonic()
+        if not ok:
+            # Várias falhas da mesma rajada contam como um único sinal de sobrecarga
+            if now - self._last_decrease >= self.cooldown:
+                self.limit = max(self.minimum, self.limit // 2)
+                self._last_decrease = now
+            self._successes = 0
+            return
+
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+        self.best_latency = self.latency if self.best_latency is None else min(self.best_latency, self.latency)
+        if self.latency > self.best_latency * self.latency_tolerance:
+            if now - self._last_decrease >= self.cooldown:
+                self.limit = max(self.minimum, self.limit - 1)
+                self._last_decrease = now
+            self._successes = 0
+            return
+
+        self._successes += 1
+        if self._successes >= self.limit:
+            self.limit = min(self.maximum, self.limit + 1)
+            self._successes = 0
+
+
+class HostThrottle:
+    """
+    Controle de acesso a um único host: taxa máxima (token bucket) e
+    concorrência adaptativa. Usado como 'async with throttle:' em volta de cada requisição.
+    """
+
+    def __init__(self, max_concurrency, rate=None):
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self.bucket = TokenBucket(rate) if rate else None
+
+    async def __aenter__(self):
+        await self.concurrency.acquire()
+        if self.bucket:
+            await self.bucket.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.concurrency.release()
+
+    def record(self, latency, status):
+        """Registra a latência e o status (None em caso de erro de conexão) de uma resposta."""
+        self.concurrency.record(latency, ok=status is not None and status not in RETRYABLE_STATUSES)
+
+
+class Throttle:
+    """Mantém um HostThrottle para cada host acessado pelo crawler."""
+
+    def __init__(self, max_concurrency, rate=None):
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self.hosts = {}
+
+    def for_url(self, url):
+        host = urlsplit(url).netloc
+        if host not in self.hosts:
+            self.hosts[host] = HostThrottle(self.max_concurrency, self.rate)
+        return self.hosts[host]
+
+
+class RetryPolicy:
+    """
+    Novas tentativas com backoff exponencial e jitter para erros de conexão,
+    timeouts e respostas 429/5xx. Respeita o header Retry-After quando presente.
+    """
+
+    def __init__(self, max_retries=3, base_delay=0.5, max_delay=30.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, status, attempt):
+        """status é None para erros de conexão e timeouts."""
+        return attempt < self.max_retries and (status is None or status in RETRYABLE_STATUSES)
+
+    def delay(self, attempt, retry_after=None):
+        """Tempo de espera antes da tentativa attempt + 1 ('full jitter')."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(self.max_delay, float(retry_after)))
+        return delay